@@ -810,15 +810,58 @@ async function handlePDFFile(file) {
         const formData = new FormData();
         formData.append('file', file);
 
-        const response = await fetch('/upload_document', {
+        const progressFill = document.getElementById('pdfProgressFill');
+        const progressText = document.getElementById('pdfProgressText');
+        progressFill.style.width = '0%';
+        progressText.textContent = 'Uploading...';
+
+        const response = await fetch('/upload_document_stream', {
             method: 'POST',
             body: formData
         });
 
-        const data = await response.json();
-
         if (!response.ok) {
-            throw new Error(data.detail || 'Document upload failed');
+            throw new Error('Document upload failed');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let data = null;
+
+        // Read progress events until the extracted text arrives
+        while (!data) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+
+            // Process complete messages
+            const lines = buffer.split('\n\n');
+            buffer = lines.pop();
+
+            for (const line of lines) {
+                if (!line.startsWith('data: ')) continue;
+                const event = JSON.parse(line.substring(6));
+
+                if (event.status === 'extracting') {
+                    if (event.total_pages) {
+                        progressFill.style.width = `${Math.round(event.page / event.total_pages * 100)}%`;
+                        progressText.textContent = `Extracting page ${event.page} of ${event.total_pages}...`;
+                    } else {
+                        progressText.textContent = event.message;
+                    }
+                } else if (event.status === 'complete') {
+                    progressFill.style.width = '100%';
+                    data = event;
+                } else if (event.status === 'error') {
+                    throw new Error(event.message);
+                }
+            }
+        }
+
+        if (!data) {
+            throw new Error('Document upload ended unexpectedly');
         }
 
         // Store extracted text
@@ -954,7 +997,8 @@ async function startTranscription() {
                         characterCount += data.text.length;
 
                         // Update display with streaming indicator for current segment
-                        const segmentHeader = `<div class="transcription-status">Segment ${data.segment_index + 1}/${data.total_segments} <span class="streaming-indicator">▸</span></div>\n\n`;
+                        const segmentCount = data.total_segments ? `${data.segment_index + 1}/${data.total_segments}` : `${data.segment_index + 1}`;
+                        const segmentHeader = `<div class="transcription-status">Segment ${segmentCount} <span class="streaming-indicator">▸</span></div>\n\n`;
                         previewContent.innerHTML = segmentHeader + fullTranscript;
 
                         // Auto-scroll to bottom
@@ -1448,24 +1492,24 @@ async function askQuestion() {
         formData.append('knowledge_level', currentLevel);
         formData.append('language', selectedLanguage);
         
-        const response = await fetch('/ask_question', {
+        const response = await fetch('/ask_question_stream', {
             method: 'POST',
             body: formData
         });
         
-        const data = await response.json();
-        
         if (!response.ok) {
+            const data = await response.json();
             throw new Error(data.detail || 'Failed to get answer');
         }
         
-        // Add to history
+        // Add to history, then fill the answer in as it streams
         const exchangeDiv = document.createElement('div');
         exchangeDiv.className = 'qa-exchange';
         exchangeDiv.innerHTML = `
             <div class="qa-question">${question}</div>
-            <div class="qa-answer">${data.answer}</div>
+            <div class="qa-answer"></div>
         `;
+        const answerDiv = exchangeDiv.querySelector('.qa-answer');
         
         qaHistory.insertBefore(exchangeDiv, qaHistory.firstChild);
         
@@ -1477,6 +1521,37 @@ async function askQuestion() {
             exchangeDiv.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
         }, 100);
         
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let answer = '';
+        
+        // Read the stream
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            
+            // Process complete messages
+            const lines = buffer.split('\n\n');
+            buffer = lines.pop();
+            
+            for (const line of lines) {
+                if (line.startsWith('data: ')) {
+                    const data = JSON.parse(line.substring(6));
+                    
+                    if (data.type === 'content') {
+                        answer += data.text;
+                        answerDiv.textContent = answer;
+                    } else if (data.type === 'error') {
+                        exchangeDiv.remove();
+                        throw new Error(data.message);
+                    }
+                }
+            }
+        }
+        
     } catch (err) {
         alert('Error: ' + err.message);
     } finally {
@@ -4,18 +4,40 @@ Audio Transcription Module
 
 Transcribes audio files using OpenAI Whisper.
 Supports both API mode (cloud) and local mode (on-device).
+Local mode uses faster-whisper (CTranslate2) when installed,
+falling back to openai-whisper.
 
 Author: Hackathon Team
 Date: November 2025
 """
 
-import tempfile
+import os
 import asyncio
-from pathlib import Path
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional
 
 from fastapi import HTTPException
 from config import config, WhisperMode
+from file_utils import FileValidator
+
+logger = logging.getLogger(__name__)
+
+# Dedicated pool for transcription work so long Whisper jobs don't starve
+# the default executor used for file I/O
+TRANSCRIBE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=max(1, (os.cpu_count() or 2) // 2),
+    thread_name_prefix="whisper"
+)
+
+# WHISPER_COMPUTE_TYPE values mapped to CTranslate2 compute types
+CTRANSLATE2_COMPUTE_TYPES = {
+    "fp32": "float32",
+    "fp16": "float16",
+    "int8": "int8",
+    "int8_float16": "int8_float16",
+}
 
 
 class AudioTranscriber:
@@ -24,7 +46,7 @@ class AudioTranscriber:
     def __init__(self):
         """Initialize transcriber based on configured mode"""
         self.mode = config.WHISPER_MODE
-        print(f"Initializing AudioTranscriber in {self.mode.value} mode")
+        logger.info("Initializing AudioTranscriber in %s mode", self.mode.value)
 
         if self.mode == WhisperMode.API:
             # Import OpenAI client for API mode
@@ -33,7 +55,7 @@ class AudioTranscriber:
                 if not config.OPENAI_API_KEY:
                     raise ValueError("OPENAI_API_KEY is required for API mode")
                 self.openai_client = openai.OpenAI(api_key=config.OPENAI_API_KEY)
-                print("OpenAI Whisper API client initialized")
+                logger.info("OpenAI Whisper API client initialized")
             except ImportError:
                 raise ImportError(
                     "openai package is required for API mode. "
@@ -41,24 +63,281 @@ class AudioTranscriber:
                 )
 
         else:  # LOCAL mode
-            # Import and load local Whisper model
+            self._check_compute_type()
+
+            # Prefer faster-whisper (CTranslate2 int8 kernels), fall back to openai-whisper
             try:
-                import whisper
-                print(f"Loading local Whisper model: {config.WHISPER_MODEL_SIZE}")
-                self.whisper_model = whisper.load_model(config.WHISPER_MODEL_SIZE)
-                print(f"Local Whisper model '{config.WHISPER_MODEL_SIZE}' loaded successfully")
+                from faster_whisper import WhisperModel
+                device, compute_type = self._detect_device()
+                if config.WHISPER_COMPUTE_TYPE != "auto":
+                    compute_type = CTRANSLATE2_COMPUTE_TYPES[config.WHISPER_COMPUTE_TYPE]
+                logger.info("Loading faster-whisper model: %s (%s, %s)", config.WHISPER_MODEL_SIZE, device, compute_type)
+                self.whisper_model = self._load_faster_whisper(WhisperModel, device, compute_type)
+                self.backend = "faster-whisper"
+                logger.info("Local Whisper model '%s' loaded successfully", config.WHISPER_MODEL_SIZE)
             except ImportError:
-                raise ImportError(
-                    "openai-whisper package is required for local mode. "
-                    "Install with: pip install openai-whisper torch torchaudio"
-                )
+                self._load_openai_whisper()
             except Exception as e:
                 raise RuntimeError(f"Failed to load local Whisper model: {str(e)}")
 
+    @staticmethod
+    def _check_compute_type():
+        """
+        Reject an unknown WHISPER_COMPUTE_TYPE before any model is loaded
+
+        Raises:
+            ValueError: If the value is not one of config.WHISPER_COMPUTE_TYPES
+        """
+        if config.WHISPER_COMPUTE_TYPE not in config.WHISPER_COMPUTE_TYPES:
+            supported = ", ".join(sorted(config.WHISPER_COMPUTE_TYPES))
+            raise ValueError(
+                f"Invalid WHISPER_COMPUTE_TYPE '{config.WHISPER_COMPUTE_TYPE}'. "
+                f"Supported values: {supported}"
+            )
+
+    @staticmethod
+    def _load_faster_whisper(model_class, device: str, compute_type: str):
+        """
+        Load faster-whisper weights from the on-disk cache
+
+        Tries the cache first without touching the network so warm starts skip
+        the Hugging Face Hub lookup; downloads into the cache only on a miss.
+
+        On CUDA, CTranslate2 keeps the encoder output and decoder KV cache in
+        device memory for the whole decode loop; only the mel features of each
+        30s window are copied to the GPU, so no extra IO binding is needed.
+        """
+        options = dict(
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=os.cpu_count() or 0,
+            download_root=config.WHISPER_CACHE_DIR
+        )
+        try:
+            return model_class(config.WHISPER_MODEL_SIZE, local_files_only=True, **options)
+        except Exception:
+            logger.info("Whisper model not cached, downloading to %s", config.WHISPER_CACHE_DIR)
+            return model_class(config.WHISPER_MODEL_SIZE, **options)
+
+    def _load_openai_whisper(self):
+        """Load the pure-PyTorch openai-whisper model (fallback backend)"""
+        compute_type = config.WHISPER_COMPUTE_TYPE
+        try:
+            import whisper
+            if compute_type == "int8_float16":
+                raise ValueError("int8_float16 requires faster-whisper; use fp32, fp16 or int8 with openai-whisper")
+
+            logger.info("Loading local Whisper model: %s (%s)", config.WHISPER_MODEL_SIZE, compute_type)
+            if compute_type == "int8":
+                # Dynamic int8 quantization of Linear layers (CPU only)
+                import torch
+                model = whisper.load_model(
+                    config.WHISPER_MODEL_SIZE,
+                    device="cpu",
+                    download_root=config.WHISPER_CACHE_DIR
+                )
+                self.whisper_model = torch.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8
+                )
+            else:
+                self.whisper_model = whisper.load_model(
+                    config.WHISPER_MODEL_SIZE,
+                    download_root=config.WHISPER_CACHE_DIR
+                )
+            self.use_fp16 = compute_type == "fp16"
+            self.backend = "openai-whisper"
+            self._compile_openai_whisper()
+            logger.info("Local Whisper model '%s' loaded successfully", config.WHISPER_MODEL_SIZE)
+        except ImportError:
+            raise ImportError(
+                "faster-whisper or openai-whisper package is required for local mode. "
+                "Install with: pip install faster-whisper"
+            )
+        except Exception as e:
+            raise RuntimeError(f"Failed to load local Whisper model: {str(e)}")
+
+    def _compile_openai_whisper(self):
+        """
+        Compile the openai-whisper encoder with torch.compile and warm it up
+
+        The encoder always sees a fixed 30s mel window, so it compiles once;
+        the decoder's growing KV cache is left eager. Falls back to the eager
+        encoder if compilation is unsupported on this platform.
+        """
+        import torch
+
+        encoder = self.whisper_model.encoder
+        try:
+            self.whisper_model.encoder = torch.compile(encoder)
+            # First call pays the compile cost; do it now with 1s of silence
+            with torch.inference_mode():
+                self.whisper_model.transcribe(torch.zeros(16000), fp16=self.use_fp16)
+            logger.info("Whisper encoder compiled with torch.compile")
+        except Exception as e:
+            self.whisper_model.encoder = encoder
+            logger.warning("torch.compile unavailable, using eager Whisper encoder: %s", e)
+
+    @staticmethod
+    def _detect_device() -> tuple[str, str]:
+        """
+        Pick device and compute type for faster-whisper
+
+        On CUDA the compute type follows the GPU's compute capability:
+        int8_float16 needs tensor cores with int8 support (Turing, 7.5+),
+        float16 needs Volta (7.0+), older GPUs fall back to float32.
+
+        Returns:
+            tuple: (device, compute_type) - int8 on CPU
+        """
+        try:
+            import torch
+            if torch.cuda.is_available():
+                capability = torch.cuda.get_device_capability()
+                if capability >= (7, 5):
+                    compute_type = "int8_float16"
+                elif capability >= (7, 0):
+                    compute_type = "float16"
+                else:
+                    compute_type = "float32"
+                logger.info("CUDA compute capability %s.%s: using %s", capability[0], capability[1], compute_type)
+                return "cuda", compute_type
+        except ImportError:
+            pass
+        return "cpu", "int8"
+
+    def _transcribe_segments(self, audio_path: str, language: Optional[str] = None):
+        """
+        Run the local model and return an iterator of segment dicts
+
+        faster-whisper decodes lazily, so each segment is produced only when
+        the iterator is advanced. openai-whisper returns all segments at once.
+
+        Args:
+            audio_path: Path to the audio file on disk
+            language: ISO 639-1 language code, None = auto-detect
+
+        Returns:
+            Iterator of {"text", "start", "end"} dicts
+        """
+        language = language if language and language != 'en' else None
+
+        if self.backend == "faster-whisper":
+            segments, info = self.whisper_model.transcribe(
+                audio_path,
+                language=language,
+                task='transcribe',
+                beam_size=5,  # Better for longer sequences
+                best_of=5,  # Better accuracy
+                patience=1.0,  # Patience for beam search
+                temperature=0,  # More deterministic
+                condition_on_previous_text=True,  # CRITICAL: Enables long-form transcription!
+                compression_ratio_threshold=2.4,  # Detect repetition
+                log_prob_threshold=-1.0,  # Filter low-probability segments
+                no_speech_threshold=0.6,  # Detect silence
+                vad_filter=True  # Skip silent stretches before decoding
+            )
+            return (
+                {"text": segment.text, "start": segment.start, "end": segment.end}
+                for segment in segments
+            )
+
+        import torch
+
+        # inference_mode skips autograd bookkeeping for every encoder/decoder op
+        with torch.inference_mode():
+            result = self.whisper_model.transcribe(
+                audio_path,
+                language=language,
+                fp16=self.use_fp16,  # FP32 unless WHISPER_COMPUTE_TYPE=fp16
+                verbose=True,  # Show progress for debugging
+                task='transcribe',  # Explicit transcribe task
+                best_of=5,  # Better accuracy
+                beam_size=5,  # Better for longer sequences
+                patience=1.0,  # Patience for beam search
+                temperature=0,  # More deterministic
+                condition_on_previous_text=True,  # CRITICAL: Enables long-form transcription!
+                initial_prompt=None,  # Let model decide based on audio
+                compression_ratio_threshold=2.4,  # Detect repetition
+                logprob_threshold=-1.0,  # Filter low-probability segments
+                no_speech_threshold=0.6  # Detect silence
+            )
+        return iter(result.get("segments") or [])
+
+    @staticmethod
+    def _format_segments(segments):
+        """
+        Annotate raw segments with timestamps and break detection
+
+        Shared by the streaming and full transcription paths. Works lazily so
+        streaming can forward each segment as soon as it is decoded.
+
+        Args:
+            segments: Iterable of {"text", "start", "end"} dicts
+
+        Yields:
+            dict: text, timestamp, is_natural_break, is_paragraph_break, segment_index
+        """
+        last_end_time = 0
+        for i, segment in enumerate(segments):
+            start_time = segment.get("start", 0)
+
+            # Format timestamp as [MM:SS]
+            minutes, seconds = divmod(int(start_time), 60)
+
+            # Detect natural breaks in conversation:
+            # 1. Pauses of 1.5+ seconds (speaker changes, breaths, topic shifts)
+            # 2. First segment
+            # Pauses of 3+ seconds also start a new paragraph
+            pause_duration = start_time - last_end_time
+
+            yield {
+                "text": segment["text"].strip(),
+                "timestamp": f"[{minutes:02d}:{seconds:02d}]",
+                "is_natural_break": pause_duration >= 1.5 or i == 0,
+                "is_paragraph_break": pause_duration > 3.0,
+                "segment_index": i
+            }
+
+            last_end_time = segment.get("end", 0)
+
+    @classmethod
+    def _build_paragraphs(cls, segments) -> str:
+        """
+        Join segments into timestamped paragraphs
+
+        Args:
+            segments: Iterable of {"text", "start", "end"} dicts
+
+        Returns:
+            str: Transcription with [MM:SS] timestamps at natural breaks
+                 and blank lines between paragraphs
+        """
+        formatted_lines = []
+        current_paragraph = []
+
+        for segment in cls._format_segments(segments):
+            # Add paragraph break if significant pause (3+ seconds)
+            if segment["is_paragraph_break"] and current_paragraph:
+                # Save current paragraph
+                formatted_lines.append(" ".join(current_paragraph))
+                formatted_lines.append("")  # Empty line for paragraph break
+                current_paragraph = []
+
+            # Add timestamp at natural breaks or first segment
+            if segment["is_natural_break"]:
+                current_paragraph.append(f"{segment['timestamp']} {segment['text']}")
+            else:
+                current_paragraph.append(segment["text"])
+
+        # Add the last paragraph
+        if current_paragraph:
+            formatted_lines.append(" ".join(current_paragraph))
+
+        return "\n".join(formatted_lines)
+
     async def transcribe_audio_streaming(
         self,
-        audio_bytes: bytes,
-        filename: str,
+        audio_path: str,
         language: Optional[str] = None
     ):
         """
@@ -67,25 +346,27 @@ class AudioTranscriber:
         """
         if self.mode == WhisperMode.API:
             # API mode doesn't support streaming, fall back to full transcription
-            text = await self._transcribe_with_api(audio_bytes, filename, language)
+            text = await self._transcribe_with_api(audio_path, language)
             yield {"type": "complete", "text": text}
         else:
             # Local mode - transcribe then stream segments
-            async for segment in self._transcribe_local_streaming(audio_bytes, filename, language):
-                yield segment
+            wav_path = await self._resample_to_wav(audio_path)
+            try:
+                async for segment in self._transcribe_local_streaming(wav_path or audio_path, language):
+                    yield segment
+            finally:
+                FileValidator.remove_temp_file(wav_path)
 
     async def transcribe_audio(
         self,
-        audio_bytes: bytes,
-        filename: str,
+        audio_path: str,
         language: Optional[str] = None
     ) -> str:
         """
         Transcribe audio file to text
 
         Args:
-            audio_bytes: Audio file content as bytes
-            filename: Original filename (for extension detection)
+            audio_path: Path to the audio file on disk (extension is kept for format detection)
             language: ISO 639-1 language code (e.g., 'en', 'es', 'fr')
                      None = auto-detect language
 
@@ -96,14 +377,54 @@ class AudioTranscriber:
             HTTPException: If transcription fails
         """
         if self.mode == WhisperMode.API:
-            return await self._transcribe_with_api(audio_bytes, filename, language)
+            return await self._transcribe_with_api(audio_path, language)
         else:
-            return await self._transcribe_local(audio_bytes, filename, language)
+            wav_path = await self._resample_to_wav(audio_path)
+            try:
+                return await self._transcribe_local(wav_path or audio_path, language)
+            finally:
+                FileValidator.remove_temp_file(wav_path)
+
+    @staticmethod
+    async def _resample_to_wav(audio_path: str) -> Optional[str]:
+        """
+        Decode audio to 16kHz mono PCM WAV with ffmpeg
+
+        Whisper resamples every input to 16kHz mono; doing it up front in an
+        ffmpeg subprocess keeps the decode off the transcription threads.
+        Only used in local mode - the API is sent the smaller compressed file.
+
+        Args:
+            audio_path: Path to the uploaded audio file
+
+        Returns:
+            Path to a temporary WAV file (caller deletes it),
+            or None if ffmpeg is unavailable or fails
+        """
+        fd, wav_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg", "-nostdin", "-y", "-loglevel", "error",
+                "-i", audio_path,
+                "-ac", "1", "-ar", "16000", "-f", "wav", "-acodec", "pcm_s16le",
+                wav_path,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await process.communicate()
+            if process.returncode == 0:
+                return wav_path
+            logger.warning("ffmpeg resample failed, using original audio: %s", stderr.decode(errors='replace').strip())
+        except FileNotFoundError:
+            logger.warning("ffmpeg not found, using original audio")
+
+        FileValidator.remove_temp_file(wav_path)
+        return None
 
     async def _transcribe_with_api(
         self,
-        audio_bytes: bytes,
-        filename: str,
+        audio_path: str,
         language: Optional[str] = None
     ) -> str:
         """
@@ -112,33 +433,33 @@ class AudioTranscriber:
         OpenAI API does not support streaming for transcription,
         so this method waits for the full result.
         """
-        temp_path = None
         try:
-            # Create temporary file (API requires file object)
-            with tempfile.NamedTemporaryFile(
-                suffix=Path(filename).suffix,
-                delete=False
-            ) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_path = temp_file.name
+            logger.info("Transcribing audio via OpenAI API (language: %s)", language or 'auto-detect')
 
-            print(f"Transcribing audio via OpenAI API (language: {language or 'auto-detect'})")
+            def request():
+                with open(audio_path, "rb") as audio_file:
+                    return self.openai_client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=audio_file,
+                        language=language if language and language != 'en' else None,
+                        response_format="verbose_json"  # Includes segment timings
+                    )
 
             # Run transcription in executor to avoid blocking
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.openai_client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=open(temp_path, "rb"),
-                    language=language if language and language != 'en' else None,
-                    response_format="text"
-                )
-            )
-
-            transcribed_text = result.strip() if isinstance(result, str) else result
+            result = await loop.run_in_executor(TRANSCRIBE_EXECUTOR, request)
+
+            # Format API segments the same way as local transcription
+            segments = [
+                {"text": segment.text, "start": segment.start, "end": segment.end}
+                for segment in (getattr(result, "segments", None) or [])
+            ]
+            if segments:
+                transcribed_text = self._build_paragraphs(segments)
+            else:
+                transcribed_text = (result.text or "").strip()
 
-            print(f"Transcription complete: {len(transcribed_text)} characters")
+            logger.info("Transcription complete: %s characters", len(transcribed_text))
             return transcribed_text
 
         except Exception as e:
@@ -154,111 +475,45 @@ class AudioTranscriber:
 
             raise HTTPException(status_code=500, detail=detail)
 
-        finally:
-            # Clean up temporary file
-            if temp_path:
-                try:
-                    Path(temp_path).unlink(missing_ok=True)
-                except Exception as cleanup_error:
-                    print(f"Warning: Failed to clean up temp file: {cleanup_error}")
-
     async def _transcribe_local_streaming(
         self,
-        audio_bytes: bytes,
-        filename: str,
+        audio_path: str,
         language: Optional[str] = None
     ):
         """
         Transcribe using local Whisper and yield segments progressively
         """
-        temp_path = None
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(
-                suffix=Path(filename).suffix,
-                delete=False
-            ) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_path = temp_file.name
-
-            print(f"Transcribing audio with local model (language: {language or 'auto-detect'})")
+            logger.info("Transcribing audio with local model (language: %s)", language or 'auto-detect')
 
-            # Run transcription in executor
+            # Start transcription in executor (segments are decoded lazily)
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.whisper_model.transcribe(
-                    temp_path,
-                    language=language if language and language != 'en' else None,
-                    fp16=False,
-                    verbose=True,
-                    task='transcribe',
-                    best_of=5,
-                    beam_size=5,
-                    patience=1.0,
-                    temperature=0,
-                    condition_on_previous_text=True,
-                    initial_prompt=None,
-                    compression_ratio_threshold=2.4,
-                    logprob_threshold=-1.0,
-                    no_speech_threshold=0.6
-                )
+            segments = await loop.run_in_executor(
+                TRANSCRIBE_EXECUTOR,
+                lambda: self._transcribe_segments(audio_path, language)
             )
 
-            # Stream segments as they're formatted with delay for organic feel
-            if "segments" in result and result["segments"]:
-                print(f"Processing {len(result['segments'])} segments")
-
-                last_end_time = 0
-                for i, segment in enumerate(result["segments"]):
-                    text = segment["text"].strip()
-                    start_time = segment.get("start", 0)
-                    end_time = segment.get("end", 0)
-
-                    # Format timestamp
-                    minutes = int(start_time // 60)
-                    seconds = int(start_time % 60)
-                    timestamp = f"[{minutes:02d}:{seconds:02d}]"
-
-                    # Detect natural breaks
-                    pause_duration = start_time - last_end_time
-                    is_natural_break = pause_duration >= 1.5
-                    is_paragraph_break = pause_duration > 3.0
-                    is_first_segment = i == 0
-
-                    # Yield segment data
-                    yield {
-                        "type": "segment",
-                        "text": text,
-                        "timestamp": timestamp,
-                        "is_natural_break": is_natural_break or is_first_segment,
-                        "is_paragraph_break": is_paragraph_break,
-                        "segment_index": i,
-                        "total_segments": len(result["segments"])
-                    }
-
-                    # Add small delay between segments for organic streaming feel
-                    # 100ms per segment gives smooth appearance without being too slow
-                    await asyncio.sleep(0.1)
-
-                    last_end_time = end_time
-
-                yield {"type": "complete"}
+            # Stream segments as soon as they're decoded
+            formatted = self._format_segments(segments)
+            count = 0
+            while True:
+                segment = await loop.run_in_executor(TRANSCRIBE_EXECUTOR, next, formatted, None)
+                if segment is None:
+                    break
+
+                # Yield segment data (total is unknown while decoding lazily)
+                yield {"type": "segment", **segment, "total_segments": None}
+                count += 1
+
+            logger.info("Processed %s segments", count)
+            yield {"type": "complete"}
 
         except Exception as e:
             yield {"type": "error", "message": str(e)}
 
-        finally:
-            if temp_path:
-                try:
-                    Path(temp_path).unlink(missing_ok=True)
-                except Exception as cleanup_error:
-                    print(f"Warning: Failed to clean up temp file: {cleanup_error}")
-
     async def _transcribe_local(
         self,
-        audio_bytes: bytes,
-        filename: str,
+        audio_path: str,
         language: Optional[str] = None
     ) -> str:
         """
@@ -266,95 +521,26 @@ class AudioTranscriber:
 
         Runs CPU/GPU-intensive transcription in executor to avoid blocking.
         """
-        temp_path = None
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(
-                suffix=Path(filename).suffix,
-                delete=False
-            ) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_path = temp_file.name
-
-            print(f"Transcribing audio with local model (language: {language or 'auto-detect'})")
+            logger.info("Transcribing audio with local model (language: %s)", language or 'auto-detect')
 
             # Run transcription in executor (CPU/GPU-intensive operation)
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                lambda: self.whisper_model.transcribe(
-                    temp_path,
-                    language=language if language and language != 'en' else None,
-                    fp16=False,  # Use FP32 for CPU compatibility
-                    verbose=True,  # Show progress for debugging
-                    task='transcribe',  # Explicit transcribe task
-                    best_of=5,  # Better accuracy
-                    beam_size=5,  # Better for longer sequences
-                    patience=1.0,  # Patience for beam search
-                    temperature=0,  # More deterministic
-                    condition_on_previous_text=True,  # CRITICAL: Enables long-form transcription!
-                    initial_prompt=None,  # Let model decide based on audio
-                    compression_ratio_threshold=2.4,  # Detect repetition
-                    logprob_threshold=-1.0,  # Filter low-probability segments
-                    no_speech_threshold=0.6  # Detect silence
-                )
+            segments = await loop.run_in_executor(
+                TRANSCRIBE_EXECUTOR,
+                lambda: list(self._transcribe_segments(audio_path, language))
             )
 
-            # Get full transcription from segments with timestamps and paragraphs
-            # result["text"] can truncate, so we rebuild from segments
-            if "segments" in result and result["segments"]:
-                print(f"Processing {len(result['segments'])} segments")
+            # Rebuild full transcription from segments with timestamps and paragraphs
+            if segments:
+                logger.info("Processing %s segments", len(segments))
 
-                # Format transcription with timestamps and paragraph breaks
-                formatted_lines = []
-                current_paragraph = []
-                last_end_time = 0
-
-                for i, segment in enumerate(result["segments"]):
-                    text = segment["text"].strip()
-                    start_time = segment.get("start", 0)
-                    end_time = segment.get("end", 0)
-
-                    # Format timestamp as [MM:SS]
-                    minutes = int(start_time // 60)
-                    seconds = int(start_time % 60)
-                    timestamp = f"[{minutes:02d}:{seconds:02d}]"
-
-                    # Detect natural breaks in conversation:
-                    # 1. Pauses of 1.5+ seconds (speaker changes, breaths, topic shifts)
-                    # 2. First segment
-                    pause_duration = start_time - last_end_time
-                    is_natural_break = pause_duration >= 1.5
-                    is_first_segment = i == 0
-
-                    # Add paragraph break if significant pause (3+ seconds)
-                    if pause_duration > 3.0 and current_paragraph:
-                        # Save current paragraph
-                        formatted_lines.append(" ".join(current_paragraph))
-                        formatted_lines.append("")  # Empty line for paragraph break
-                        current_paragraph = []
-                        # After paragraph break, always add timestamp
-                        is_natural_break = True
-
-                    # Add timestamp at natural breaks or first segment
-                    if is_natural_break or is_first_segment:
-                        current_paragraph.append(f"{timestamp} {text}")
-                    else:
-                        current_paragraph.append(text)
-
-                    last_end_time = end_time
-
-                # Add the last paragraph
-                if current_paragraph:
-                    formatted_lines.append(" ".join(current_paragraph))
-
-                transcribed_text = "\n".join(formatted_lines)
+                transcribed_text = self._build_paragraphs(segments)
             else:
-                # Fallback to result["text"] if no segments available
-                print("Warning: No segments found, using result['text']")
-                transcribed_text = result["text"].strip()
+                logger.warning("No segments found in transcription")
+                transcribed_text = ""
 
-            print(f"Transcription complete: {len(transcribed_text)} characters from {len(result.get('segments', []))} segments")
+            logger.info("Transcription complete: %s characters from %s segments", len(transcribed_text), len(segments))
             return transcribed_text
 
         except Exception as e:
@@ -363,15 +549,3 @@ class AudioTranscriber:
                 detail=f"Local transcription failed: {str(e)}"
             )
 
-        finally:
-            # Clean up temporary file
-            if temp_path:
-                try:
-                    Path(temp_path).unlink(missing_ok=True)
-                except Exception as cleanup_error:
-                    print(f"Warning: Failed to clean up temp file: {cleanup_error}")
-
-
-# Singleton transcriber instance
-# Initialized once on module import to load model only once
-transcriber = AudioTranscriber()
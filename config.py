@@ -4,7 +4,12 @@ Configuration Module for Adaptive Lecture Summarizer
 
 Manages environment variables and application settings for:
 - Whisper transcription mode (API or local)
+- Local Whisper precision (fp32, fp16, int8, int8_float16)
 - File size limits
+- Response cache settings
+- Streaming concurrency and rate limits
+- Session memory store (Redis or in-process)
+- Logging (level, queued background writer)
 - Supported file formats
 - API keys
 
@@ -12,7 +17,11 @@ Author: Hackathon Team
 Date: November 2025
 """
 
+import atexit
+import logging
 import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from enum import Enum
 from dotenv import load_dotenv
 
@@ -33,17 +42,55 @@ class Config:
     WHISPER_MODE = WhisperMode(os.getenv("WHISPER_MODE", "api"))
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     WHISPER_MODEL_SIZE = os.getenv("WHISPER_MODEL_SIZE", "base")
+    WHISPER_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "auto").lower()  # auto = detect from hardware
+    WHISPER_COMPUTE_TYPES = {"auto", "fp32", "fp16", "int8", "int8_float16"}
+    WHISPER_CACHE_DIR = os.getenv("WHISPER_CACHE_DIR", os.path.expanduser("~/.cache/whisper"))
 
     # ===== File Size Limits (in bytes) =====
     MAX_PDF_SIZE = int(os.getenv("MAX_PDF_SIZE_MB", "50")) * 1024 * 1024      # Default: 50MB
     MAX_AUDIO_SIZE = int(os.getenv("MAX_AUDIO_SIZE_MB", "200")) * 1024 * 1024  # Default: 200MB
+    UPLOAD_CHUNK_SIZE = 1024 * 1024  # Stream uploads to disk in 1MB chunks
+    UPLOAD_SPOOL_SIZE = 8 * 1024 * 1024  # Document uploads larger than 8MB spill from memory to disk
 
     # ===== Supported File Formats =====
     AUDIO_FORMATS = {".mp3", ".wav", ".m4a"}
     PDF_FORMAT = ".pdf"
 
+    # ===== Server =====
+    # Each worker is a separate process with its own session memory and Whisper model
+    WORKERS = int(os.getenv("WORKERS", "1"))
+
+    # ===== Streaming Limits =====
+    MAX_CONCURRENT_STREAMS = int(os.getenv("MAX_CONCURRENT_STREAMS", "8"))  # Summary streams per worker
+    STREAM_RATE_LIMIT = os.getenv("STREAM_RATE_LIMIT", "5/minute")         # Per client IP (slowapi syntax)
+
+    # ===== Session Memory =====
+    REDIS_URL = os.getenv("REDIS_URL")                         # Unset = keep sessions in process
+    SESSION_TTL = int(os.getenv("SESSION_TTL", "86400"))       # Seconds, matches the session cookie
+    MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "1000"))      # In-process store only
+    MAX_SOURCE_CHARS = int(os.getenv("MAX_SOURCE_CHARS", "500000"))    # Per source added to memory
+    MAX_MEMORY_CHARS = int(os.getenv("MAX_MEMORY_CHARS", "2000000"))   # Combined text per session
+
+    # ===== CORS =====
+    CORS_ORIGINS = [
+        origin.strip()
+        for origin in os.getenv("CORS_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000").split(",")
+        if origin.strip()
+    ]
+
+    # ===== Logging =====
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()  # DEBUG/INFO for development
+
     # ===== Anthropic API =====
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+    ANTHROPIC_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "200"))  # Per worker
+    ANTHROPIC_MAX_KEEPALIVE = int(os.getenv("ANTHROPIC_MAX_KEEPALIVE", "100"))      # Idle connections kept open
+    ANTHROPIC_REQUESTS_PER_MINUTE = int(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "40"))  # Per worker, excess calls queue
+    ANTHROPIC_MAX_RETRIES = int(os.getenv("ANTHROPIC_MAX_RETRIES", "6"))  # 429/529/5xx, exponential backoff
+
+    # ===== Response Cache =====
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))  # Cosine similarity for a hit
+    SEMANTIC_CACHE_DIR = os.getenv("SEMANTIC_CACHE_DIR", os.path.expanduser("~/.cache/lecture-summarizer"))
 
     # ===== Validation =====
     @classmethod
@@ -59,6 +106,11 @@ class Config:
         if cls.WHISPER_MODE == WhisperMode.API and not cls.OPENAI_API_KEY:
             errors.append("OPENAI_API_KEY is required when WHISPER_MODE=api")
 
+        # Check local model precision
+        if cls.WHISPER_COMPUTE_TYPE not in cls.WHISPER_COMPUTE_TYPES:
+            supported = ", ".join(sorted(cls.WHISPER_COMPUTE_TYPES))
+            errors.append(f"WHISPER_COMPUTE_TYPE must be one of: {supported}")
+
         if errors:
             error_msg = "Configuration errors:\n" + "\n".join(f"  - {err}" for err in errors)
             raise ValueError(error_msg)
@@ -68,3 +120,20 @@ class Config:
 
 # Singleton configuration instance
 config = Config()
+
+# Configure logging once for every module (imported before any of them log).
+# Handlers only enqueue records; a listener thread does the formatting and
+# stream writes, so request handlers never block on stderr.
+_log_queue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_enqueue = QueueHandler(_log_queue)
+_log_enqueue.setFormatter(logging.Formatter("%(message)s"))  # Full layout is applied by _log_stream
+log_listener = QueueListener(_log_queue, _log_stream)
+logging.basicConfig(
+    level=config.LOG_LEVEL,
+    handlers=[_log_enqueue],
+    force=True
+)
+log_listener.start()
+atexit.register(log_listener.stop)  # Flush queued records on exit
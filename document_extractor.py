@@ -11,27 +11,183 @@ Supports:
 Note: .doc and .ppt (older binary formats) may have limited support.
 For best results, use .docx and .pptx formats.
 
+Format backends are imported on first use so that importing this module
+stays cheap (e.g. for TXT-only uploads).
+
 Author: Hackathon Team
 Date: November 2025
 """
 
+import codecs
+import functools
 import io
-from typing import Optional
-from docx import Document
-from pptx import Presentation
-from PyPDF2 import PdfReader
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, repeat
+from typing import BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Pages per worker process when extracting large PDFs in parallel
+PARALLEL_PAGE_THRESHOLD = 64
+
+# Upper bound on PDF worker processes, whatever the core count
+MAX_PDF_WORKERS = 4
+
+
+@functools.lru_cache(maxsize=1)
+def pdf_page_pool() -> ProcessPoolExecutor:
+    """
+    Worker processes shared by all large-PDF extraction, started on first use
+
+    Workers are spawned rather than forked: forking a server that already
+    runs threads (log listener, Whisper, executors) can deadlock the child.
+    Each spawned worker re-imports the launching module, which is why the
+    app loads its models in a startup hook and not at import.
+    """
+    return ProcessPoolExecutor(
+        max_workers=min(os.cpu_count() or 1, MAX_PDF_WORKERS),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+# Byte-order marks checked before sampling for UTF-8
+TEXT_BOMS = (
+    (b'\xef\xbb\xbf', 'utf-8-sig'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+)
+
+# Bytes checked for UTF-8 validity on files without a BOM
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+
+def _detect_encoding(file_bytes: bytes) -> str:
+    """Detect a text file's encoding from its BOM or a 64KB prefix"""
+    for bom, encoding in TEXT_BOMS:
+        if file_bytes.startswith(bom):
+            return encoding
+
+    try:
+        # Incremental decode tolerates a multi-byte character cut at the sample edge
+        codecs.getincrementaldecoder('utf-8')().decode(file_bytes[:ENCODING_SAMPLE_SIZE])
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+# DrawingML / PresentationML namespaces used in slide XML
+PPTX_NAMESPACES = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+}
+TABLE_ROW_TAG = "{%s}tr" % PPTX_NAMESPACES["a"]
+
+# The title placeholder is the one with idx 0 (matches python-pptx's shapes.title)
+_TITLE_SHAPE = "p:sp[p:nvSpPr/p:nvPr/p:ph[not(@idx) or @idx='0']]"
+
+
+@functools.lru_cache(maxsize=1)
+def _pptx_xpaths():
+    """Compile slide XPath queries once (lxml is imported on first PPTX)"""
+    from lxml import etree
+
+    def xpath(query):
+        return etree.XPath(query, namespaces=PPTX_NAMESPACES)
+
+    return {
+        # Paragraphs of the slide title
+        "title": xpath(f"p:cSld/p:spTree/{_TITLE_SHAPE}[1]/p:txBody/a:p"),
+        # Non-title paragraphs outside tables, plus table rows, in document order
+        "content": xpath(f".//a:p[not(ancestor::a:tbl) and not(ancestor::{_TITLE_SHAPE})] | .//a:tbl/a:tr"),
+        # Text runs and line breaks of one paragraph
+        "runs": xpath(".//a:t/text() | .//a:br"),
+        # Cells of one table row
+        "cells": xpath("a:tc"),
+    }
+
+
+def _pptx_paragraph_text(paragraph) -> str:
+    """Concatenate the text runs of an a:p element (line breaks become newlines)"""
+    return "".join(part if isinstance(part, str) else "\n" for part in _pptx_xpaths()["runs"](paragraph))
+
+
+def _pptx_row_cells(row):
+    """Yield the stripped text of each cell in an a:tr table row"""
+    for cell in _pptx_xpaths()["cells"](row):
+        yield "\n".join(_pptx_paragraph_text(p) for p in cell.iter(f"{{{PPTX_NAMESPACES['a']}}}p")).strip()
+
+
+def extract_pdf_page(pdf, page_index: int) -> str:
+    """Extract stripped text from a single page of an open PDFium document ('' on failure)"""
+    page = pdf[page_index]
+    try:
+        textpage = page.get_textpage()
+        text = textpage.get_text_range().replace("\r\n", "\n").strip()
+        textpage.close()
+        return text
+    except Exception as e:
+        logger.warning("Could not extract text from page %s: %s", page_index + 1, e)
+        return ""
+    finally:
+        page.close()
+
+
+def _extract_page_range(file_bytes: bytes, start: int, stop: int) -> list[str]:
+    """Extract non-empty page texts for pages [start, stop) in a worker process"""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(file_bytes)
+    try:
+        return [text for text in (extract_pdf_page(pdf, i) for i in range(start, stop)) if text]
+    finally:
+        pdf.close()
+
+
+def extract_pdf_pages(pdf, source: BinaryIO | bytes) -> list[str]:
+    """
+    Extract the non-empty text of every page of an open PDFium document, in order
+
+    Large PDFs are split into page ranges on pdf_page_pool (PDFium is not
+    thread-safe), each worker re-opening the document from its own copy of
+    the bytes; only then is a file source read into memory.
+
+    Args:
+        pdf: Open pypdfium2 PdfDocument
+        source: Bytes or seekable binary file the document was opened from
+    """
+    num_pages = len(pdf)
+    workers = min(os.cpu_count() or 1, MAX_PDF_WORKERS, num_pages // PARALLEL_PAGE_THRESHOLD + 1)
+    if workers == 1:
+        return [text for text in (extract_pdf_page(pdf, i) for i in range(num_pages)) if text]
+
+    if not isinstance(source, bytes):
+        source.seek(0)
+        source = source.read()
+    step = -(-num_pages // workers)
+    starts = range(0, num_pages, step)
+    page_ranges = pdf_page_pool().map(
+        _extract_page_range,
+        repeat(source),
+        starts,
+        [min(start + step, num_pages) for start in starts]
+    )
+    return list(chain.from_iterable(page_ranges))
 
 
 class DocumentExtractor:
     """Extract text from various document formats"""
 
     @staticmethod
-    def extract_from_pdf(file_bytes: bytes) -> str:
+    def extract_from_pdf(file: BinaryIO) -> str:
         """
         Extract text from PDF file
 
         Args:
-            file_bytes: PDF file content as bytes
+            file: Seekable binary file with the PDF content
 
         Returns:
             Extracted text as string
@@ -39,32 +195,29 @@ class DocumentExtractor:
         Raises:
             ValueError: If PDF is encrypted or cannot be read
         """
-        try:
-            pdf_file = io.BytesIO(file_bytes)
-            reader = PdfReader(pdf_file)
-
-            if reader.is_encrypted:
-                raise ValueError("Encrypted PDFs are not supported. Please provide an unencrypted PDF.")
+        import pypdfium2 as pdfium
 
-            text_content = []
-            for page_num, page in enumerate(reader.pages, 1):
-                try:
-                    text = page.extract_text()
-                    if text.strip():
-                        text_content.append(text)
-                except Exception as e:
-                    print(f"Warning: Could not extract text from page {page_num}: {str(e)}")
-                    continue
+        try:
+            try:
+                pdf = pdfium.PdfDocument(file)  # Reads pages from the file as needed
+            except pdfium.PdfiumError as e:
+                if "password" in str(e).lower():
+                    raise ValueError("Encrypted PDFs are not supported. Please provide an unencrypted PDF.")
+                raise
 
-            full_text = "\n\n".join(text_content)
+            try:
+                full_text = "\n\n".join(extract_pdf_pages(pdf, file))
+            finally:
+                pdf.close()
 
-            if not full_text.strip() or len(full_text.strip()) < 50:
+            full_text = full_text.strip()
+            if len(full_text) < 50:
                 raise ValueError(
                     "Could not extract sufficient text from PDF. "
                     "The PDF might be scanned/image-based or empty."
                 )
 
-            return full_text.strip()
+            return full_text
 
         except Exception as e:
             if isinstance(e, ValueError):
@@ -72,12 +225,12 @@ class DocumentExtractor:
             raise ValueError(f"Failed to process PDF: {str(e)}")
 
     @staticmethod
-    def extract_from_docx(file_bytes: bytes) -> str:
+    def extract_from_docx(file: BinaryIO) -> str:
         """
         Extract text from Word DOCX file
 
         Args:
-            file_bytes: DOCX file content as bytes
+            file: Seekable binary file with the DOCX content
 
         Returns:
             Extracted text as string
@@ -85,38 +238,38 @@ class DocumentExtractor:
         Raises:
             ValueError: If DOCX cannot be read or is empty
         """
-        try:
-            docx_file = io.BytesIO(file_bytes)
-            doc = Document(docx_file)
+        from docx import Document
 
-            text_content = []
+        try:
+            doc = Document(file)
 
             # Extract text from paragraphs
-            for paragraph in doc.paragraphs:
-                text = paragraph.text.strip()
-                if text:
-                    text_content.append(text)
+            def paragraph_texts():
+                for paragraph in doc.paragraphs:
+                    text = paragraph.text.strip()
+                    if text:
+                        yield text
 
             # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = []
-                    for cell in row.cells:
-                        cell_text = cell.text.strip()
-                        if cell_text:
-                            row_text.append(cell_text)
-                    if row_text:
-                        text_content.append(" | ".join(row_text))
-
-            full_text = "\n\n".join(text_content)
-
-            if not full_text.strip() or len(full_text.strip()) < 50:
+            def table_texts():
+                for table in doc.tables:
+                    for row in table.rows:
+                        row_text = " | ".join(
+                            cell_text for cell_text in (cell.text.strip() for cell in row.cells) if cell_text
+                        )
+                        if row_text:
+                            yield row_text
+
+            full_text = "\n\n".join(chain(paragraph_texts(), table_texts()))
+
+            full_text = full_text.strip()
+            if len(full_text) < 50:
                 raise ValueError(
                     "Could not extract sufficient text from Word document. "
                     "The document might be empty or contain only images."
                 )
 
-            return full_text.strip()
+            return full_text
 
         except Exception as e:
             if isinstance(e, ValueError):
@@ -124,12 +277,12 @@ class DocumentExtractor:
             raise ValueError(f"Failed to process Word document: {str(e)}")
 
     @staticmethod
-    def extract_from_pptx(file_bytes: bytes) -> str:
+    def extract_from_pptx(file: BinaryIO) -> str:
         """
         Extract text from PowerPoint PPTX file
 
         Args:
-            file_bytes: PPTX file content as bytes
+            file: Seekable binary file with the PPTX content
 
         Returns:
             Extracted text as string
@@ -137,52 +290,49 @@ class DocumentExtractor:
         Raises:
             ValueError: If PPTX cannot be read or is empty
         """
-        try:
-            pptx_file = io.BytesIO(file_bytes)
-            prs = Presentation(pptx_file)
+        from pptx import Presentation
 
-            text_content = []
+        try:
+            prs = Presentation(file)
 
-            for slide_num, slide in enumerate(prs.slides, 1):
-                slide_text = []
+            xpaths = _pptx_xpaths()
 
+            def slide_lines(slide_num, slide):
                 # Extract title
-                if slide.shapes.title:
-                    title = slide.shapes.title.text.strip()
-                    if title:
-                        slide_text.append(f"=== Slide {slide_num}: {title} ===")
-
-                # Extract text from all shapes
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        text = shape.text.strip()
-                        if text and text != slide.shapes.title.text if slide.shapes.title else True:
-                            slide_text.append(text)
-
-                    # Extract text from tables
-                    if shape.has_table:
-                        table = shape.table
-                        for row in table.rows:
-                            row_text = []
-                            for cell in row.cells:
-                                cell_text = cell.text.strip()
-                                if cell_text:
-                                    row_text.append(cell_text)
-                            if row_text:
-                                slide_text.append(" | ".join(row_text))
-
-                if slide_text:
-                    text_content.append("\n".join(slide_text))
-
-            full_text = "\n\n".join(text_content)
-
-            if not full_text.strip() or len(full_text.strip()) < 50:
+                title_text = "\n".join(_pptx_paragraph_text(p) for p in xpaths["title"](slide.element)).strip()
+                if title_text:
+                    yield f"=== Slide {slide_num}: {title_text} ==="
+
+                # Extract text from all shapes and tables in one XPath pass
+                for node in xpaths["content"](slide.element):
+                    if node.tag == TABLE_ROW_TAG:
+                        row_text = " | ".join(
+                            cell_text for cell_text in _pptx_row_cells(node) if cell_text
+                        )
+                        if row_text:
+                            yield row_text
+                    else:
+                        # Skip text repeating the title already emitted
+                        text = _pptx_paragraph_text(node).strip()
+                        if text and text != title_text:
+                            yield text
+
+            def slide_texts():
+                for slide_num, slide in enumerate(prs.slides, 1):
+                    slide_text = "\n".join(slide_lines(slide_num, slide))
+                    if slide_text:
+                        yield slide_text
+
+            full_text = "\n\n".join(slide_texts())
+
+            full_text = full_text.strip()
+            if len(full_text) < 50:
                 raise ValueError(
                     "Could not extract sufficient text from PowerPoint. "
                     "The presentation might be empty or contain only images."
                 )
 
-            return full_text.strip()
+            return full_text
 
         except Exception as e:
             if isinstance(e, ValueError):
@@ -190,12 +340,12 @@ class DocumentExtractor:
             raise ValueError(f"Failed to process PowerPoint presentation: {str(e)}")
 
     @staticmethod
-    def extract_from_txt(file_bytes: bytes) -> str:
+    def extract_from_txt(file: BinaryIO) -> str:
         """
         Extract text from plain text file
 
         Args:
-            file_bytes: TXT file content as bytes
+            file: Binary file with the TXT content
 
         Returns:
             Extracted text as string
@@ -204,16 +354,18 @@ class DocumentExtractor:
             ValueError: If text file is empty or cannot be decoded
         """
         try:
-            # Try UTF-8 first
+            # Pick the codec once, then decode the whole buffer in one pass
+            file_bytes = file.read()
+            encoding = _detect_encoding(file_bytes)
             try:
-                text = file_bytes.decode('utf-8')
+                text = file_bytes.decode(encoding)
             except UnicodeDecodeError:
-                # Fallback to latin-1
+                # Detection only saw a prefix; fallback to latin-1
                 text = file_bytes.decode('latin-1')
 
             text = text.strip()
 
-            if not text or len(text) < 50:
+            if len(text) < 50:
                 raise ValueError("Text file is empty or too short (minimum 50 characters required)")
 
             return text
@@ -223,13 +375,23 @@ class DocumentExtractor:
                 raise
             raise ValueError(f"Failed to process text file: {str(e)}")
 
+    # Extension -> (extractor function, display name), built once at import
+    _EXTRACTORS = {
+        'pdf': (extract_from_pdf.__func__, 'PDF'),
+        'doc': (extract_from_docx.__func__, 'Word Document'),
+        'docx': (extract_from_docx.__func__, 'Word Document'),
+        'ppt': (extract_from_pptx.__func__, 'PowerPoint'),
+        'pptx': (extract_from_pptx.__func__, 'PowerPoint'),
+        'txt': (extract_from_txt.__func__, 'Text File'),
+    }
+
     @staticmethod
-    def extract_text(file_bytes: bytes, filename: str) -> tuple[str, str]:
+    def extract_text(file: BinaryIO | bytes, filename: str) -> tuple[str, str]:
         """
         Extract text from any supported document format
 
         Args:
-            file_bytes: File content as bytes
+            file: Seekable binary file (e.g. a spooled upload) or the content as bytes
             filename: Original filename with extension
 
         Returns:
@@ -238,25 +400,20 @@ class DocumentExtractor:
         Raises:
             ValueError: If file format is unsupported or extraction fails
         """
-        file_extension = filename.lower().split('.')[-1] if '.' in filename else ''
-
-        extractors = {
-            'pdf': (DocumentExtractor.extract_from_pdf, 'PDF'),
-            'doc': (DocumentExtractor.extract_from_docx, 'Word Document'),
-            'docx': (DocumentExtractor.extract_from_docx, 'Word Document'),
-            'ppt': (DocumentExtractor.extract_from_pptx, 'PowerPoint'),
-            'pptx': (DocumentExtractor.extract_from_pptx, 'PowerPoint'),
-            'txt': (DocumentExtractor.extract_from_txt, 'Text File'),
-        }
-
-        if file_extension not in extractors:
-            supported = ', '.join(extractors.keys())
+        file_extension = os.path.splitext(filename)[1][1:].lower()
+
+        extractor = DocumentExtractor._EXTRACTORS.get(file_extension)
+        if extractor is None:
+            supported = ', '.join(DocumentExtractor._EXTRACTORS)
             raise ValueError(
                 f"Unsupported file format: .{file_extension}. "
                 f"Supported formats: {supported}"
             )
 
-        extractor_func, file_type = extractors[file_extension]
-        text = extractor_func(file_bytes)
+        if isinstance(file, bytes):
+            file = io.BytesIO(file)
+
+        extractor_func, file_type = extractor
+        text = extractor_func(file)
 
         return text, file_type
@@ -11,24 +11,49 @@ Author: Hackathon Team
 Date: November 2025
 """
 
+import functools
+import hashlib
+import logging
+import tempfile
 from pathlib import Path
+from typing import BinaryIO, Optional
 from fastapi import UploadFile, HTTPException
 from config import config
 
+logger = logging.getLogger(__name__)
+
+# Units used by FileValidator.format_file_size
+SIZE_UNITS = ("B", "KB", "MB", "GB")
+
+# Leading bytes expected for each binary document format (TXT has none)
+DOCUMENT_SIGNATURES = {
+    '.pdf': (b'%PDF',),
+    '.docx': (b'PK\x03\x04',),
+    '.pptx': (b'PK\x03\x04',),
+    '.doc': (b'\xd0\xcf\x11\xe0', b'PK\x03\x04'),  # OLE2 or mislabelled DOCX
+    '.ppt': (b'\xd0\xcf\x11\xe0', b'PK\x03\x04'),  # OLE2 or mislabelled PPTX
+}
+
 
 class FileValidator:
     """Validates uploaded files against size and type constraints"""
 
     @staticmethod
-    async def validate_document(file: UploadFile) -> bytes:
+    async def validate_document(file: UploadFile) -> tuple[BinaryIO, str]:
         """
         Validate document file size and format (PDF, DOC, DOCX, PPT, PPTX, TXT)
 
+        The upload is copied in chunks to a spooled temporary file, which
+        stays in memory for small documents and spills to disk past
+        UPLOAD_SPOOL_SIZE, so a large upload is never held as one bytes object.
+        The chunks are hashed on the way through.
+
         Args:
             file: Uploaded document file from FastAPI
 
         Returns:
-            bytes: File content as bytes
+            tuple: (file content positioned at the start, caller must close it;
+                    SHA-256 hex digest of the content)
 
         Raises:
             HTTPException: If file is invalid (wrong type, too large)
@@ -46,31 +71,55 @@ class FileValidator:
                 detail=f"Unsupported file format. Supported formats: {supported_list}"
             )
 
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
-
-        # Check file size
-        if file_size > config.MAX_PDF_SIZE:  # Reuse PDF size limit for all documents
-            max_size_mb = config.MAX_PDF_SIZE / (1024 * 1024)
+        # Reject oversized uploads before reading when the size is known
+        max_size_mb = config.MAX_PDF_SIZE / (1024 * 1024)
+        if file.size is not None and file.size > config.MAX_PDF_SIZE:
             raise HTTPException(
                 status_code=400,
                 detail=f"File too large. Maximum size: {max_size_mb:.0f}MB"
             )
 
-        # Check minimum size (prevent empty files)
-        if file_size < 100:
-            raise HTTPException(
-                status_code=400,
-                detail="File is too small or empty"
-            )
-
-        # Reset file pointer for further processing
+        # Spool file content in chunks, bailing out once over the limit
+        spool = tempfile.SpooledTemporaryFile(max_size=config.UPLOAD_SPOOL_SIZE)
+        digest = hashlib.sha256()
+        try:
+            file_size = 0
+            while chunk := await file.read(config.UPLOAD_CHUNK_SIZE):
+                if not file_size:
+                    # Check magic bytes on the first chunk
+                    signatures = DOCUMENT_SIGNATURES.get(file_extension)
+                    if signatures and not any(sig in chunk[:1024] for sig in signatures):
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"File content does not match its {file_extension} extension"
+                        )
+                file_size += len(chunk)
+                if file_size > config.MAX_PDF_SIZE:  # Reuse PDF size limit for all documents
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File too large. Maximum size: {max_size_mb:.0f}MB"
+                    )
+                spool.write(chunk)
+                digest.update(chunk)
+
+            # Check minimum size (prevent empty files)
+            if file_size < 100:
+                raise HTTPException(
+                    status_code=400,
+                    detail="File is too small or empty"
+                )
+
+        except BaseException:
+            spool.close()
+            raise
+
+        # Reset file pointers for further processing
         await file.seek(0)
-        return content
+        spool.seek(0)
+        return spool, digest.hexdigest()
 
     @staticmethod
-    async def validate_pdf(file: UploadFile) -> bytes:
+    async def validate_pdf(file: UploadFile) -> tuple[BinaryIO, str]:
         """
         Validate PDF file (legacy method for backwards compatibility)
         Use validate_document instead
@@ -78,15 +127,18 @@ class FileValidator:
         return await FileValidator.validate_document(file)
 
     @staticmethod
-    async def validate_audio(file: UploadFile) -> bytes:
+    async def validate_audio(file: UploadFile) -> str:
         """
-        Validate audio file size and format
+        Validate audio file size and format, spooling it to disk
+
+        The upload is copied to a temporary file in chunks so memory use stays
+        bounded by the chunk size instead of the file size.
 
         Args:
             file: Uploaded audio file from FastAPI
 
         Returns:
-            bytes: File content as bytes
+            str: Path to the temporary audio file (caller must delete it)
 
         Raises:
             HTTPException: If file is invalid (wrong format, too large)
@@ -100,30 +152,58 @@ class FileValidator:
                 detail=f"Unsupported audio format. Supported formats: {supported_formats}"
             )
 
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
-
-        # Check file size
-        if file_size > config.MAX_AUDIO_SIZE:
+        # Reject oversized uploads before reading when the size is known
+        if file.size is not None and file.size > config.MAX_AUDIO_SIZE:
             max_size_mb = config.MAX_AUDIO_SIZE / (1024 * 1024)
             raise HTTPException(
                 status_code=400,
                 detail=f"Audio file too large. Maximum size: {max_size_mb:.0f}MB"
             )
 
-        # Check minimum size (prevent empty files)
-        if file_size < 1000:
-            raise HTTPException(
-                status_code=400,
-                detail="Audio file is too small or empty"
-            )
+        # Stream file content to disk, checking size as we go
+        temp_file = tempfile.NamedTemporaryFile(suffix=file_ext, delete=False)
+        try:
+            file_size = 0
+            with temp_file:
+                while chunk := await file.read(config.UPLOAD_CHUNK_SIZE):
+                    file_size += len(chunk)
+                    if file_size > config.MAX_AUDIO_SIZE:
+                        max_size_mb = config.MAX_AUDIO_SIZE / (1024 * 1024)
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Audio file too large. Maximum size: {max_size_mb:.0f}MB"
+                        )
+                    temp_file.write(chunk)
+
+            # Check minimum size (prevent empty files)
+            if file_size < 1000:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Audio file is too small or empty"
+                )
+
+        except BaseException:
+            Path(temp_file.name).unlink(missing_ok=True)
+            raise
+
+        return temp_file.name
 
-        # Reset file pointer
-        await file.seek(0)
-        return content
+    @staticmethod
+    def remove_temp_file(path: Optional[str]) -> None:
+        """
+        Delete a temporary upload file, ignoring cleanup errors
+
+        Args:
+            path: Path returned by a validate_* method (None is a no-op)
+        """
+        if path:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except Exception as cleanup_error:
+                logger.warning("Failed to clean up temp file: %s", cleanup_error)
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def format_file_size(size_bytes: int) -> str:
         """
         Format file size in human-readable format
@@ -136,7 +216,10 @@ class FileValidator:
         """
         if size_bytes < 1024:
             return f"{size_bytes} B"
-        elif size_bytes < 1024 * 1024:
-            return f"{size_bytes / 1024:.1f} KB"
-        else:
-            return f"{size_bytes / (1024 * 1024):.1f} MB"
+
+        size = float(size_bytes)
+        unit = 0
+        while size >= 1024 and unit < len(SIZE_UNITS) - 1:
+            size /= 1024
+            unit += 1
+        return f"{size:.1f} {SIZE_UNITS[unit]}"
@@ -33,79 +33,260 @@ Author: Hackathon Team
 Date: November 2025
 """
 
+import asyncio
+import contextlib
+import functools
+import hashlib
+import logging
 import os
+import re
 import uuid
+from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
 
-from fastapi import FastAPI, Form, HTTPException, Request, UploadFile, File, Cookie, Response
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi import FastAPI, Depends, Form, HTTPException, Request, UploadFile, File, Cookie, Response
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.requests import Request
 from fastapi.middleware.cors import CORSMiddleware
 import anthropic
+import httpx
+import orjson
+from aiolimiter import AsyncLimiter
 from dotenv import load_dotenv
+from slowapi import Limiter, _rate_limit_exceeded_handler
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
 
 # Import file upload modules
 from config import config, WhisperMode
 from file_utils import FileValidator
-from pdf_extractor import PDFExtractor
+from pdf_extractor import PDF_EXECUTOR, PDFExtractor
 from document_extractor import DocumentExtractor
-from audio_transcription import transcriber
+from audio_transcription import AudioTranscriber
+from semantic_cache import SemanticCache, content_digest, create_response_cache
+from session_store import SOURCE_TYPE_LABELS, MemoryFullError, session_store
 
 # Load environment variables
 load_dotenv()
 
-# Initialize API clients
-anthropic_client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+logger = logging.getLogger(__name__)
+
+# Initialize API client
+# Outgoing Claude requests (including SDK retries) are paced per worker, so a
+# burst of users queues here instead of tripping the API's rate limit
+anthropic_rate_limiter = AsyncLimiter(config.ANTHROPIC_REQUESTS_PER_MINUTE, 60)
+
+
+async def wait_for_rate_limit(request: httpx.Request):
+    """
+    httpx request hook: wait for a slot in the per-minute request budget
+    """
+    await anthropic_rate_limiter.acquire()
+
+
+# One pooled HTTP/2 connection set shared by all async Claude calls, so
+# concurrent streams multiplex over a connection instead of each paying a TLS handshake
+# (read timeout matches the SDK default: /process waits for a full 8000-token reply)
+anthropic_http_client = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(600.0, connect=10.0),
+    limits=httpx.Limits(
+        max_connections=config.ANTHROPIC_MAX_CONNECTIONS,
+        max_keepalive_connections=config.ANTHROPIC_MAX_KEEPALIVE,
+        keepalive_expiry=60.0
+    ),
+    event_hooks={"request": [wait_for_rate_limit]}
+)
+# The SDK retries 429/529/5xx with exponential backoff and jitter, honouring retry-after
+async_anthropic_client = anthropic.AsyncAnthropic(
+    api_key=os.getenv("ANTHROPIC_API_KEY"),
+    http_client=anthropic_http_client,
+    max_retries=config.ANTHROPIC_MAX_RETRIES
+)
 
 # Initialize FastAPI app
-app = FastAPI(title="Adaptive Lecture Summarizer")
+app = FastAPI(title="Adaptive Lecture Summarizer", default_response_class=ORJSONResponse)
 
 # Mount static files and templates
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
-from fastapi.responses import StreamingResponse
-import json as json_module
+# Per-client rate limiting (429 once exceeded)
+limiter = Limiter(key_func=get_remote_address)
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-import asyncio
+# Summary streams generating at once; further streams wait their turn
+stream_semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_STREAMS)
 
-# Enable CORS for local development
+# Enable CORS for the configured origins only (the bundled frontend is same-origin)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=config.CORS_ORIGINS,
+    allow_credentials=False,
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Content-Type"],
+    max_age=86400,  # Browsers cache preflight results for 24 hours
 )
 
-# Session-based memory storage (in production, use Redis or database)
-# Key: session_id, Value: {"sources": [], "combined_text": ""}
-lecture_memory = {}
-
-def generate_quiz(transcript: str, knowledge_level: int) -> list:
-    """
-    Generate natural language quiz questions based on knowledge level
-    Returns list of questions
-    """
-    level_descriptions = {
-        0: "complete beginner with no prior knowledge",
-        1: "beginner with basic familiarity",
-        2: "intermediate learner with solid foundation",
-        3: "advanced learner with strong background",
-        4: "expert with deep technical knowledge"
+# Whisper transcriber and response cache, set by the load_models startup hook
+transcriber: Optional[AudioTranscriber] = None
+response_cache: Optional[SemanticCache] = None
+
+# Session-based memory lives in session_store (Redis or in-process, with TTL)
+# Per session: {"sources": [], "combined_text": ""}
+
+# Per-level summary calls in flight at once across /process jobs, and each call's output budget
+summary_level_semaphore = asyncio.Semaphore(5)
+SUMMARY_LEVEL_MAX_TOKENS = 1600
+
+# Background /process and /precompute_session jobs (per process)
+# Key: job_id, Value: (kind, asyncio.Task resolving to the job's response body),
+# kind being the route that started it, so each poll route sees only its own jobs
+summary_jobs = {}
+
+# Jobs kept at once: finished ones are dropped oldest first, and new jobs are
+# refused while every slot holds a pending one
+MAX_SUMMARY_JOBS = 256
+
+# Seconds between status checks of a /precompute_session message batch
+PRECOMPUTE_POLL_SECONDS = 30
+
+# Extracted text of recent document uploads (per process, LRU)
+# Key: (SHA-256 of the file, extension), Value: (text, file_type, PDF metadata or None)
+extracted_documents = OrderedDict()
+EXTRACTED_CACHE_CHARS = 16 * 1024 * 1024  # Total text kept before the oldest uploads are dropped
+
+# Simple document type reported to the frontend, by file extension
+DOCUMENT_TYPES = {
+    'pdf': 'pdf',
+    'doc': 'document',
+    'docx': 'document',
+    'ppt': 'presentation',
+    'pptx': 'presentation',
+    'txt': 'text'
+}
+
+# Audience descriptions for quiz generation and Q&A answers, by knowledge level (0-4)
+QUIZ_LEVEL_DESCRIPTIONS = {
+    0: "complete beginner with no prior knowledge",
+    1: "beginner with basic familiarity",
+    2: "intermediate learner with solid foundation",
+    3: "advanced learner with strong background",
+    4: "expert with deep technical knowledge"
+}
+
+# (level name, question focus) for adaptive quiz questions, by difficulty level (0-4)
+QUESTION_LEVEL_DESCRIPTIONS = {
+    0: ("complete beginner", "basic recall and simple concepts"),
+    1: ("beginner", "fundamental understanding and basic application"),
+    2: ("intermediate", "connecting concepts and practical application"),
+    3: ("advanced", "deep analysis and nuanced understanding"),
+    4: ("expert", "critical evaluation and expert-level insights")
+}
+
+# Response languages offered by the frontend
+LANGUAGE_NAMES = {
+    'en': 'English',
+    'es': 'Spanish',
+    'fr': 'French',
+    'de': 'German',
+    'zh': 'Chinese',
+    'ja': 'Japanese',
+    'ar': 'Arabic',
+    'hi': 'Hindi',
+    'pt': 'Portuguese',
+    'ru': 'Russian'
+}
+
+# Prompt prefix per language code (English, the default, needs none)
+LANGUAGE_INSTRUCTIONS = {
+    code: f"Respond in {name}." for code, name in LANGUAGE_NAMES.items() if code != 'en'
+}
+
+# Feedback style for answer evaluation, by knowledge level (0-4)
+EVALUATION_LEVEL_GUIDANCE = {
+    0: {
+        "name": "complete beginner",
+        "tone": "extremely encouraging and patient",
+        "depth": "Explain concepts using simple analogies. Celebrate effort and progress. Provide gentle guidance without overwhelming.",
+        "criteria": "Look for basic understanding of core concepts, even if terminology isn't perfect."
+    },
+    1: {
+        "name": "beginner",
+        "tone": "supportive and clear",
+        "depth": "Build confidence while introducing proper terminology. Explain why misconceptions occur.",
+        "criteria": "Expect foundational understanding with some technical terms, but allow for informal explanations."
+    },
+    2: {
+        "name": "intermediate",
+        "tone": "constructive and detailed",
+        "depth": "Connect concepts to broader context. Point out nuances they might have missed.",
+        "criteria": "Expect proper use of terminology and ability to connect related concepts."
+    },
+    3: {
+        "name": "advanced",
+        "tone": "analytical and thought-provoking",
+        "depth": "Discuss implications and edge cases. Challenge them to think deeper about assumptions.",
+        "criteria": "Expect sophisticated understanding, nuanced analysis, and awareness of limitations."
+    },
+    4: {
+        "name": "expert",
+        "tone": "collegial and rigorous",
+        "depth": "Engage with technical precision. Discuss research implications and novel insights.",
+        "criteria": "Expect mastery-level analysis, critical evaluation, and identification of what's significant or novel."
     }
+}
+
+# Summary instructions for each of the 5 knowledge levels
+SUMMARY_LEVELS = [
+    {
+        "label": "COMPLETE BEGINNER (0.0-0.2)",
+        "audience": "someone with absolutely no prior knowledge of this topic",
+        "approach": "Start with the absolute basics. Define every technical term using simple, everyday language. Use relatable analogies and real-world examples.",
+        "language_style": "conversational and patient",
+        "depth": "Focus on 'what' and 'why' before 'how'. Break down complex ideas into digestible pieces.",
+        "avoid": "jargon, acronyms without explanation, assumptions about prior knowledge"
+    },
+    {
+        "label": "BEGINNER (0.2-0.4)",
+        "audience": "someone with basic familiarity who wants to build a stronger foundation",
+        "approach": "Introduce proper terminology while still providing clear explanations. Connect new concepts to familiar ones.",
+        "language_style": "clear and supportive",
+        "depth": "Explain both 'what' and 'why', with some introduction to 'how'. Use examples to reinforce understanding.",
+        "avoid": "overly technical details, advanced edge cases"
+    },
+    {
+        "label": "INTERMEDIATE (0.4-0.6)",
+        "audience": "someone with solid foundational knowledge seeking deeper understanding",
+        "approach": "Use standard technical terminology. Show how concepts connect and build upon each other. Include practical applications.",
+        "language_style": "professional and informative",
+        "depth": "Balance 'what', 'why', and 'how'. Discuss practical implications and use cases.",
+        "avoid": "over-simplification, repetition of basic concepts"
+    },
+    {
+        "label": "ADVANCED (0.6-0.8)",
+        "audience": "someone with strong technical background seeking nuanced insights",
+        "approach": "Use advanced terminology freely. Discuss nuances, trade-offs, and edge cases. Explore implications and connections to related concepts.",
+        "language_style": "analytical and detailed",
+        "depth": "Emphasize 'how' and 'why'. Discuss limitations, alternatives, and deeper implications.",
+        "avoid": "over-explaining basics, surface-level descriptions"
+    },
+    {
+        "label": "EXPERT (0.8-1.0)",
+        "audience": "someone with expert-level knowledge seeking cutting-edge insights",
+        "approach": "Be concise and information-dense. Focus on what's novel, significant, or non-obvious. Discuss research implications and future directions.",
+        "language_style": "rigorous and precise",
+        "depth": "Dive deep into advanced implications, research frontiers, and sophisticated analysis.",
+        "avoid": "basic explanations, redundant information"
+    }
+]
 
-    try:
-        print(f"Generating quiz for level {knowledge_level}...")
-        message = anthropic_client.messages.create(
-            model="claude-sonnet-4-5-20250929",  # Keep Sonnet for quiz quality
-            max_tokens=2000,
-            messages=[{
-                "role": "user",
-                "content": f"""Based on this lecture transcript, create 4 natural language quiz questions for a {level_descriptions[knowledge_level]}.
+
+# Quiz instructions, pre-formatted for each knowledge level
+QUIZ_PROMPT_TEMPLATE = """Based on the lecture transcript above, create 4 natural language quiz questions for a {description}.
 
 These questions should:
 - Be open-ended (require explanation, not yes/no)
@@ -113,9 +294,6 @@ These questions should:
 - Encourage critical thinking
 - Be answerable based on the lecture content
 
-Transcript:
-{transcript}
-
 Format your response as a JSON array of questions ONLY, like this:
 [
   "Question 1 text here?",
@@ -125,46 +303,187 @@ Format your response as a JSON array of questions ONLY, like this:
 ]
 
 Return ONLY the JSON array, no other text."""
-            }]
-        )
+QUIZ_PROMPTS = {
+    level: QUIZ_PROMPT_TEMPLATE.format(description=description)
+    for level, description in QUIZ_LEVEL_DESCRIPTIONS.items()
+}
 
-        response_text = message.content[0].text.strip()
-        print("Quiz generated successfully!")
-        print(f"Raw response: {response_text[:200]}...")
+# Evaluation instructions with the tone filled in per knowledge level;
+# {question} and {user_answer} are formatted in per request
+EVALUATION_PROMPT_TEMPLATE = """Evaluate this answer briefly and constructively, using the lecture transcript above as reference content.
+
+**Question:** {question}
+
+**Student's Answer:** {user_answer}
+
+**Evaluation Guidelines:**
+- Keep feedback under 50 words
+- Be {tone}
+- If correct: Confirm + 1 key insight
+- If partial: Point out what's right + 1 key missing piece
+- If incorrect: Briefly clarify the correct concept
+
+**Scoring:**
+- "correct": Strong understanding (minor details may be missing)
+- "partial": Partial understanding with gaps
+- "incorrect": Major misunderstanding
+
+Return ONLY JSON:
+{{
+  "score": "correct|partial|incorrect",
+  "feedback": "Your concise feedback (under 50 words)"
+}}"""
+EVALUATION_PROMPTS = {
+    level: EVALUATION_PROMPT_TEMPLATE.replace("{tone}", guidance["tone"])
+    for level, guidance in EVALUATION_LEVEL_GUIDANCE.items()
+}
+
+# Reference content for evaluation: transcript chunks most relevant to the
+# answer, or the opening characters when no embedding model is installed
+EVALUATION_EXCERPTS = 3
+EVALUATION_CONTEXT_CHARS = 3000
+
+# Adaptive question instructions with the level filled in; {previous_context} is formatted per request
+QUESTION_PROMPT_TEMPLATE = """Based on the lecture transcript above, create ONE open-ended quiz question for a {level_name} level learner.
+
+Difficulty Level: {difficulty_level}/4 (0=easiest, 4=hardest)
+Focus: {level_focus}
+{previous_context}
+
+The question should:
+- Be open-ended (require explanation, not yes/no)
+- Test {level_focus}
+- Be answerable based on the lecture content
+- Be at exactly difficulty level {difficulty_level}
+
+Return ONLY the question text, nothing else."""
+QUESTION_PROMPTS = {
+    level: QUESTION_PROMPT_TEMPLATE.format(
+        level_name=level_name,
+        level_focus=level_focus,
+        difficulty_level=level,
+        previous_context="{previous_context}"
+    )
+    for level, (level_name, level_focus) in QUESTION_LEVEL_DESCRIPTIONS.items()
+}
+
+# Level separator in multi-level summary responses, e.g. ---LEVEL_2---
+LEVEL_MARKER = re.compile(r"---LEVEL_(\d)---[ \t]*\n?")
+LEVEL_MARKER_LENGTH = len("---LEVEL_0---")
+
+# Pre-encoded start of the SSE frame sent for every streamed token
+SSE_CONTENT_PREFIX = b'data: {"type":"content","level":'
+
+# Everything before the text of a content event, per summary level
+SSE_CONTENT_HEADERS = {level: SSE_CONTENT_PREFIX + b'%d,"text":' % level for level in range(5)}
+
+# Markdown code fence (``` or ~~~, optional json hint) wrapped around a JSON reply
+JSON_FENCE = re.compile(r"(```|~~~)(?:[ \t]*json)?[ \t]*\n?(.*?)\1", re.DOTALL | re.IGNORECASE)
 
-        # Remove markdown code blocks if present
-        if response_text.startswith('```'):
-            # Remove ```json and ``` markers
-            response_text = response_text.replace('```json', '').replace('```', '').strip()
+
+def sse_event(payload: dict) -> bytes:
+    """
+    Frame a payload as a Server-Sent Event (orjson, yielded as bytes)
+    """
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+def sse_content(text: str, level) -> bytes:
+    """
+    Frame a streamed token as an SSE content event
+
+    Hot path: only the token text is serialized per call; the frame header
+    comes precomputed from SSE_CONTENT_HEADERS.
+    """
+    header = SSE_CONTENT_HEADERS.get(level)
+    if header is None:
+        header = SSE_CONTENT_PREFIX + orjson.dumps(level) + b',"text":'
+    return b"".join((header, orjson.dumps(text), b"}\n\n"))
+
+
+def parse_json_response(response_text: str):
+    """
+    Parse a JSON reply from Claude, unwrapping a markdown code fence if present
+
+    Raises:
+        ValueError: If the reply is empty or not valid JSON (orjson.JSONDecodeError)
+    """
+    match = JSON_FENCE.search(response_text)
+    if match:
+        response_text = match.group(2)
+    return orjson.loads(response_text)
+
+
+@functools.lru_cache(maxsize=16)
+def transcript_block(transcript: str) -> dict:
+    """
+    Build the message content block holding the transcript
+
+    Prompts put this block first and their instructions after it, so every
+    call on the same transcript shares a prefix that Anthropic caches
+    (cache_control) instead of re-processing the transcript tokens.
+    Memoized: the summary, quiz and question calls of a session reuse one
+    block instead of each copying the transcript into a new string. The
+    returned dict is shared and must not be modified.
+    """
+    return {
+        "type": "text",
+        "text": f"Lecture Transcript:\n{transcript}",
+        "cache_control": {"type": "ephemeral"}
+    }
+
+
+def quiz_params(transcript: str, knowledge_level: int) -> dict:
+    """
+    Request parameters for one level's quiz (shared by generate_quiz and batch precompute)
+    """
+    return {
+        "model": "claude-sonnet-4-5-20250929",  # Keep Sonnet for quiz quality
+        "max_tokens": 2000,
+        "messages": [{
+            "role": "user",
+            "content": [transcript_block(transcript), {"type": "text", "text": QUIZ_PROMPTS[knowledge_level]}]
+        }]
+    }
+
+
+async def generate_quiz(transcript: str, knowledge_level: int) -> tuple:
+    """
+    Generate natural language quiz questions based on knowledge level
+    Returns tuple of questions (immutable, as the same object is served from the cache)
+    """
+    cached = await response_cache.alookup(transcript, "quiz", knowledge_level)
+    if cached is not None:
+        return cached
+
+    try:
+        logger.info("Generating quiz for level %s...", knowledge_level)
+        message = await async_anthropic_client.messages.create(**quiz_params(transcript, knowledge_level))
+
+        response_text = message.content[0].text.strip()
+        logger.info("Quiz generated successfully!")
+        logger.debug("Raw response: %.200s...", response_text)
 
         # Parse JSON response
-        import json
-        questions = json.loads(response_text)
+        questions = tuple(parse_json_response(response_text))
 
+        await response_cache.astore(transcript, "quiz", knowledge_level, questions)
         return questions
 
     except Exception as e:
-        print(f"Quiz generation error: {str(e)}")
+        logger.error("Quiz generation error: %s", e)
         raise HTTPException(status_code=500, detail=f"Quiz generation failed: {str(e)}")
 
 
-def generate_single_question(transcript: str, difficulty_level: int, previous_questions: list = None) -> str:
+async def generate_single_question(transcript: str, difficulty_level: int, previous_questions: list = None) -> str:
     """
     Generate a single question at specific difficulty level for adaptive quiz
     Returns a single question string
     """
-    level_descriptions = {
-        0: ("complete beginner", "basic recall and simple concepts"),
-        1: ("beginner", "fundamental understanding and basic application"),
-        2: ("intermediate", "connecting concepts and practical application"),
-        3: ("advanced", "deep analysis and nuanced understanding"),
-        4: ("expert", "critical evaluation and expert-level insights")
-    }
-
-    level_name, level_focus = level_descriptions[difficulty_level]
+    level_name, _ = QUESTION_LEVEL_DESCRIPTIONS[difficulty_level]
 
     try:
-        print(f"Generating question at difficulty level {difficulty_level} ({level_name})...")
+        logger.info("Generating question at difficulty level %s (%s)...", difficulty_level, level_name)
 
         # Build context about previous questions to avoid repetition
         previous_context = ""
@@ -172,257 +491,115 @@ def generate_single_question(transcript: str, difficulty_level: int, previous_qu
             previous_context = f"\n\nPrevious questions already asked:\n" + "\n".join([f"- {q}" for q in previous_questions])
             previous_context += "\n\nMake sure this question tests a DIFFERENT concept or aspect of the content."
 
-        message = anthropic_client.messages.create(
+        message = await async_anthropic_client.messages.create(
             model="claude-sonnet-4-5-20250929",
             max_tokens=500,
             messages=[{
                 "role": "user",
-                "content": f"""Based on this lecture transcript, create ONE open-ended quiz question for a {level_name} level learner.
-
-Difficulty Level: {difficulty_level}/4 (0=easiest, 4=hardest)
-Focus: {level_focus}
-
-Transcript:
-{transcript}
-{previous_context}
-
-The question should:
-- Be open-ended (require explanation, not yes/no)
-- Test {level_focus}
-- Be answerable based on the lecture content
-- Be at exactly difficulty level {difficulty_level}
-
-Return ONLY the question text, nothing else."""
+                "content": [
+                    transcript_block(transcript),
+                    {"type": "text", "text": QUESTION_PROMPTS[difficulty_level].format(previous_context=previous_context)}
+                ]
             }]
         )
 
         question = message.content[0].text.strip()
-        print(f"Generated level {difficulty_level} question: {question[:100]}...")
+        logger.info("Generated level %s question: %.100s...", difficulty_level, question)
 
         return question
 
     except Exception as e:
-        print(f"Question generation error: {str(e)}")
+        logger.error("Question generation error: %s", e)
         raise Exception(f"Question generation failed: {str(e)}")
 
 
-def evaluate_answer(question: str, user_answer: str, transcript: str, knowledge_level: int) -> dict:
+async def evaluate_answer(question: str, user_answer: str, transcript: str, knowledge_level: int) -> dict:
     """
     Evaluate a user's natural language answer to a quiz question
     Returns feedback and assessment
     """
-    import json
-    import re
-
-    level_guidance = {
-        0: {
-            "name": "complete beginner",
-            "tone": "extremely encouraging and patient",
-            "depth": "Explain concepts using simple analogies. Celebrate effort and progress. Provide gentle guidance without overwhelming.",
-            "criteria": "Look for basic understanding of core concepts, even if terminology isn't perfect."
-        },
-        1: {
-            "name": "beginner",
-            "tone": "supportive and clear",
-            "depth": "Build confidence while introducing proper terminology. Explain why misconceptions occur.",
-            "criteria": "Expect foundational understanding with some technical terms, but allow for informal explanations."
-        },
-        2: {
-            "name": "intermediate",
-            "tone": "constructive and detailed",
-            "depth": "Connect concepts to broader context. Point out nuances they might have missed.",
-            "criteria": "Expect proper use of terminology and ability to connect related concepts."
-        },
-        3: {
-            "name": "advanced",
-            "tone": "analytical and thought-provoking",
-            "depth": "Discuss implications and edge cases. Challenge them to think deeper about assumptions.",
-            "criteria": "Expect sophisticated understanding, nuanced analysis, and awareness of limitations."
-        },
-        4: {
-            "name": "expert",
-            "tone": "collegial and rigorous",
-            "depth": "Engage with technical precision. Discuss research implications and novel insights.",
-            "criteria": "Expect mastery-level analysis, critical evaluation, and identification of what's significant or novel."
-        }
-    }
+    evaluation_prompt = EVALUATION_PROMPTS.get(knowledge_level, EVALUATION_PROMPTS[2])
 
-    level_info = level_guidance.get(knowledge_level, level_guidance[2])
+    # Same question and answer against the same reference content
+    answer_text = f"{question}\n\n{user_answer}"
+    reference_key = (knowledge_level, content_digest(transcript))
+    cached = await response_cache.alookup(answer_text, "evaluation", reference_key)
+    if cached is not None:
+        return cached
 
     try:
-        print(f"Evaluating answer for level {knowledge_level}...", flush=True)
-        message = anthropic_client.messages.create(
+        logger.info("Evaluating answer for level %s...", knowledge_level)
+
+        # Reference only the transcript passages relevant to this question and answer
+        reference = await asyncio.to_thread(
+            response_cache.relevant_excerpts, transcript, answer_text, EVALUATION_EXCERPTS
+        )
+        if reference is None:
+            reference = transcript[:EVALUATION_CONTEXT_CHARS]
+
+        # The excerpt differs per answer, so it is a plain block: no cache
+        # write to pay for, and it stays out of transcript_block's memo
+        message = await async_anthropic_client.messages.create(
             model="claude-sonnet-4-5-20250929",
             max_tokens=400,
             messages=[{
                 "role": "user",
-                "content": f"""Evaluate this answer briefly and constructively.
-
-**Question:** {question}
-
-**Student's Answer:** {user_answer}
-
-**Reference Content:**
-{transcript[:3000]}
-
-**Evaluation Guidelines:**
-- Keep feedback under 50 words
-- Be {level_info['tone']}
-- If correct: Confirm + 1 key insight
-- If partial: Point out what's right + 1 key missing piece
-- If incorrect: Briefly clarify the correct concept
-
-**Scoring:**
-- "correct": Strong understanding (minor details may be missing)
-- "partial": Partial understanding with gaps
-- "incorrect": Major misunderstanding
-
-Return ONLY JSON:
-{{
-  "score": "correct|partial|incorrect",
-  "feedback": "Your concise feedback (under 50 words)"
-}}"""
+                "content": [
+                    {"type": "text", "text": f"Lecture Transcript:\n{reference}"},
+                    {"type": "text", "text": evaluation_prompt.format(question=question, user_answer=user_answer)}
+                ]
             }]
         )
 
-        print("API call successful, processing response...", flush=True)
+        logger.debug("API call successful, processing response...")
 
         # Get response text
         response_text = message.content[0].text.strip()
-        print(f"Raw response length: {len(response_text)}", flush=True)
-        print(f"Raw response first 200 chars: {response_text[:200]}", flush=True)
-
-        # Remove markdown code blocks if present
-        if '```' in response_text:
-            print("Detected code block markers, extracting JSON...", flush=True)
-            # Try to find JSON block
-            json_match = re.search(r'```(?:json)?\s*\n?(.*?)\n?```', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(1).strip()
-                print("Extracted JSON from code block", flush=True)
-            else:
-                # If no match, just remove all lines with ```
-                lines = response_text.split('\n')
-                lines = [line for line in lines if '```' not in line]
-                response_text = '\n'.join(lines).strip()
-                print("Removed code block markers manually", flush=True)
-
-        print(f"Cleaned response length: {len(response_text)}", flush=True)
-        print(f"Cleaned response: {response_text}", flush=True)
+        logger.debug("Raw response length: %s", len(response_text))
+        logger.debug("Raw response first 200 chars: %.200s", response_text)
 
         # Parse JSON response
-        if not response_text:
-            raise ValueError("Response text is empty after cleaning")
-
-        evaluation = json.loads(response_text)
-        print(f"JSON parsed successfully: {evaluation}", flush=True)
+        evaluation = parse_json_response(response_text)
+        logger.debug("JSON parsed successfully: %s", evaluation)
 
+        await response_cache.astore(answer_text, "evaluation", reference_key, evaluation)
         return evaluation
         
     except Exception as e:
-        print(f"Answer evaluation error: {str(e)}")
+        logger.error("Answer evaluation error: %s", e)
         raise HTTPException(status_code=500, detail=f"Answer evaluation failed: {str(e)}")
 
 
-async def generate_all_summaries_stream(transcript: str, language: str = 'en', knowledge_level: float = 0.0):
+@functools.lru_cache(maxsize=64)
+def build_levels_prompt(levels: range, language_instruction: str) -> str:
     """
-    Generate summaries starting from user's current knowledge level
-    """
-    try:
-        # Convert knowledge level (0.0-1.0) to level index (0-4)
-        start_level = min(4, int(knowledge_level * 5))
-        print(f"Starting streaming summary generation in {language} from level {start_level}...")
-
-        # Language mapping
-        language_names = {
-            'en': 'English',
-            'es': 'Spanish',
-            'fr': 'French',
-            'de': 'German',
-            'zh': 'Chinese',
-            'ja': 'Japanese',
-            'ar': 'Arabic',
-            'hi': 'Hindi',
-            'pt': 'Portuguese',
-            'ru': 'Russian'
-        }
+    Build the instructions for streaming several summary levels in one response
 
-        language_instruction = f"Respond in {language_names.get(language, 'English')}." if language != 'en' else ""
-
-        # Send initial test message
-        yield f"data: {json_module.dumps({'type': 'test', 'message': 'Stream started'})}\n\n"
-
-        level_descriptions = [
-            {
-                "label": "COMPLETE BEGINNER (0.0-0.2)",
-                "audience": "someone with absolutely no prior knowledge of this topic",
-                "approach": "Start with the absolute basics. Define every technical term using simple, everyday language. Use relatable analogies and real-world examples.",
-                "language_style": "conversational and patient",
-                "depth": "Focus on 'what' and 'why' before 'how'. Break down complex ideas into digestible pieces.",
-                "avoid": "jargon, acronyms without explanation, assumptions about prior knowledge"
-            },
-            {
-                "label": "BEGINNER (0.2-0.4)",
-                "audience": "someone with basic familiarity who wants to build a stronger foundation",
-                "approach": "Introduce proper terminology while still providing clear explanations. Connect new concepts to familiar ones.",
-                "language_style": "clear and supportive",
-                "depth": "Explain both 'what' and 'why', with some introduction to 'how'. Use examples to reinforce understanding.",
-                "avoid": "overly technical details, advanced edge cases"
-            },
-            {
-                "label": "INTERMEDIATE (0.4-0.6)",
-                "audience": "someone with solid foundational knowledge seeking deeper understanding",
-                "approach": "Use standard technical terminology. Show how concepts connect and build upon each other. Include practical applications.",
-                "language_style": "professional and informative",
-                "depth": "Balance 'what', 'why', and 'how'. Discuss practical implications and use cases.",
-                "avoid": "over-simplification, repetition of basic concepts"
-            },
-            {
-                "label": "ADVANCED (0.6-0.8)",
-                "audience": "someone with strong technical background seeking nuanced insights",
-                "approach": "Use advanced terminology freely. Discuss nuances, trade-offs, and edge cases. Explore implications and connections to related concepts.",
-                "language_style": "analytical and detailed",
-                "depth": "Emphasize 'how' and 'why'. Discuss limitations, alternatives, and deeper implications.",
-                "avoid": "over-explaining basics, surface-level descriptions"
-            },
-            {
-                "label": "EXPERT (0.8-1.0)",
-                "audience": "someone with expert-level knowledge seeking cutting-edge insights",
-                "approach": "Be concise and information-dense. Focus on what's novel, significant, or non-obvious. Discuss research implications and future directions.",
-                "language_style": "rigorous and precise",
-                "depth": "Dive deep into advanced implications, research frontiers, and sophisticated analysis.",
-                "avoid": "basic explanations, redundant information"
-            }
-        ]
-
-        # Generate from user's level onwards
-        for level in range(start_level, 5):
-            level_info = level_descriptions[level]
-
-            yield f"data: {json_module.dumps({'type': 'level_start', 'level': level})}\n\n"
-
-            with anthropic_client.messages.stream(
-                model="claude-sonnet-4-5-20250929",  # Using Sonnet - Haiku 4 not available yet
-                max_tokens=1500,
-                messages=[{
-                    "role": "user",
-                    "content": f"""{language_instruction}
-
-You are creating a lecture summary for **{level_info['audience']}**.
-
-**Level:** {level_info['label']}
+    Each level's summary is introduced by a ---LEVEL_N--- marker line so the
+    stream can be routed to the right level as it arrives. Cached: there are
+    only 5 start levels x supported languages.
+    """
+    level_sections = "\n\n".join(
+        f"""**LEVEL {level} - {SUMMARY_LEVELS[level]['label']}**
+Audience: {SUMMARY_LEVELS[level]['audience']}
+Approach: {SUMMARY_LEVELS[level]['approach']}
+Language Style: {SUMMARY_LEVELS[level]['language_style']}
+Depth: {SUMMARY_LEVELS[level]['depth']}
+Avoid: {SUMMARY_LEVELS[level]['avoid']}"""
+        for level in levels
+    )
+    format_example = "\n\n".join(
+        f"---LEVEL_{level}---\n[{SUMMARY_LEVELS[level]['label']} summary with ## section headers]"
+        for level in levels
+    )
 
-**Your Approach:**
-{level_info['approach']}
+    return f"""{language_instruction}
 
-**Language Style:** {level_info['language_style']}
-**Depth:** {level_info['depth']}
-**Avoid:** {level_info['avoid']}
+Create {len(levels)} different summaries of the lecture transcript above, one for each knowledge level below. Each summary should be DISTINCTLY DIFFERENT and avoid repeating information unnecessarily. Tailor every explanation to that level's audience.
 
-**Lecture Transcript:**
-{transcript}
+{level_sections}
 
-**Structure your summary with these sections:**
+**Structure each summary with these sections:**
 
 ## Key Concepts
 Identify and explain the main ideas at the appropriate depth for this level.
@@ -436,259 +613,409 @@ Relevant specifics, examples, or technical information suited to this level.
 ## Suggested Focus Areas
 What should they study or practice to deepen their understanding?
 
-Remember: Tailor every explanation to {level_info['audience']}. {level_info['approach']}"""
-                }]
-            ) as stream:
-                for text in stream.text_stream:
-                    yield f"data: {json_module.dumps({'type': 'content', 'text': text, 'level': level})}\n\n"
+Format your response EXACTLY like this:
+{format_example}"""
 
-        # Send completion event
-        yield f"data: {json_module.dumps({'type': 'complete'})}\n\n"
-        print("Streaming complete!")
 
-    except Exception as e:
-        error_data = json_module.dumps({'type': 'error', 'message': str(e)})
-        yield f"data: {error_data}\n\n"
-        print(f"Streaming error: {str(e)}")
+class LevelStreamSplitter:
+    """
+    Route streamed text of a multi-level response to its ---LEVEL_N--- section
 
+    Only the newly arrived text (plus a short held-back tail that could be
+    the start of a marker) is scanned per chunk; markers are not forwarded.
+    """
 
-def generate_all_summaries(transcript: str) -> dict:
+    def __init__(self):
+        self.level = None
+        self._pending = ""
+
+    def feed(self, text: str):
+        """
+        Consume a chunk of streamed text
+
+        Yields:
+            tuple: (level, None) when a level's marker is found,
+                   (level, text) for text belonging to that level
+        """
+        pending = self._pending + text
+        while True:
+            match = LEVEL_MARKER.search(pending)
+            if not match:
+                break
+            if match.start() and self.level is not None:
+                yield self.level, pending[:match.start()]
+            self.level = int(match.group(1))
+            yield self.level, None
+            pending = pending[match.end():]
+
+        # Hold back a trailing '-' run that may be the start of the next marker
+        hold = pending.find("-", max(0, len(pending) - LEVEL_MARKER_LENGTH))
+        if hold == -1:
+            hold = len(pending)
+        if hold and self.level is not None:
+            yield self.level, pending[:hold]
+        self._pending = pending[hold:]
+
+    def flush(self):
+        """Yield any held-back text once the stream has ended"""
+        if self._pending and self.level is not None:
+            yield self.level, self._pending
+        self._pending = ""
+
+
+# Chunks buffered between the stream reader, the SSE encoder and the response
+STREAM_QUEUE_SIZE = 256
+
+# Queue sentinel marking the end of a stream
+STREAM_END = object()
+
+# Characters per content event when replaying cached summaries
+REPLAY_CHUNK_CHARS = 40
+
+# Streamed text of one level is merged into a content event for up to this long / this many characters
+CONTENT_BATCH_SECONDS = 0.03
+CONTENT_BATCH_CHARS = 512
+
+# SSE frames are batched into one socket write for up to this long / this many bytes
+SSE_COALESCE_SECONDS = 0.02
+SSE_COALESCE_BYTES = 16 * 1024
+
+# Comment frame sent when a stream has been idle this long, so proxies keep the connection open
+SSE_HEARTBEAT_SECONDS = 15.0
+SSE_HEARTBEAT = b": ping\n\n"
+
+
+async def read_level_stream(transcript: str, levels: range, language_instruction: str, raw_queue: asyncio.Queue):
     """
-    Generate 5 adaptive summaries with streaming
-    Yields chunks as they're generated
+    Producer task: read the Claude stream and queue (level, text) events
+
+    An API error is queued as the exception itself, followed by STREAM_END.
     """
+    splitter = LevelStreamSplitter()
     try:
-        print("Starting streaming summary generation...")
-        
-        # Send initial test message
-        yield f"data: {json_module.dumps({'type': 'test', 'message': 'Stream started'})}\n\n"
-        
-        # Track which level we're currently receiving
-        current_level = None
-        buffer = ""
-        
-        with anthropic_client.messages.stream(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=8000,
+        async with async_anthropic_client.messages.stream(
+            model="claude-sonnet-4-5-20250929",  # Using Sonnet - Haiku 4 not available yet
+            max_tokens=1500 * len(levels),
             messages=[{
                 "role": "user",
-                "content": f"""Create 5 different summaries of this lecture transcript, each adapted to a different knowledge level. Each summary should be DISTINCTLY DIFFERENT and avoid repeating information unnecessarily.
+                "content": [
+                    transcript_block(transcript),
+                    {"type": "text", "text": build_levels_prompt(levels, language_instruction)}
+                ]
+            }]
+        ) as stream:
+            async for text in stream.text_stream:
+                for event in splitter.feed(text):
+                    await raw_queue.put(event)
 
-**LEVEL 0 - COMPLETE BEGINNER (0.0-0.2)**
-Assumes absolutely no prior knowledge. Define every technical term in simple language. Use everyday analogies. Build from first principles. Be patient and thorough.
+        for event in splitter.flush():
+            await raw_queue.put(event)
+    except Exception as e:
+        await raw_queue.put(e)
+    await raw_queue.put(STREAM_END)
 
-**LEVEL 1 - BEGINNER (0.2-0.4)**  
-Assumes basic familiarity with the topic area. Still explain technical terms but can assume some foundational concepts. Use clear examples.
 
-**LEVEL 2 - INTERMEDIATE (0.4-0.6)**
-Assumes solid foundational knowledge. Use standard technical terminology. Focus on connections between concepts and practical applications.
+async def encode_level_stream(raw_queue: asyncio.Queue, sse_queue: asyncio.Queue, sections: dict) -> bool:
+    """
+    Encoder task: frame queued (level, text) events as SSE bytes
 
-**LEVEL 3 - ADVANCED (0.6-0.8)**
-Assumes strong technical background. Use advanced terminology freely. Focus on nuances, implications, and deeper understanding.
+    Text of one level is batched into a single content event for up to
+    CONTENT_BATCH_SECONDS or CONTENT_BATCH_CHARS, so the client gets a few
+    frames per second rather than one per token. Ends with a complete (or
+    error) event followed by STREAM_END.
 
-**LEVEL 4 - EXPERT (0.8-1.0)**
-Assumes expert-level knowledge. Be concise and dense. Focus on cutting-edge insights, edge cases, research implications, and what's novel or significant.
+    Args:
+        sections: Filled with level -> list of text parts as they are encoded
 
-Transcript:
-{transcript}
+    Returns:
+        bool: True if the stream completed without an error
+    """
+    loop = asyncio.get_running_loop()
+    getter = None
+
+    async def next_item(timeout=None):
+        # The pending get() survives a timeout, so no item is lost between batches
+        nonlocal getter
+        if getter is None:
+            getter = asyncio.ensure_future(raw_queue.get())
+        done, _ = await asyncio.wait((getter,), timeout=timeout)
+        if not done:
+            return None
+        task, getter = getter, None
+        return task.result()
+
+    completed = False
+    carry = None
+    try:
+        while True:
+            item = carry if carry is not None else await next_item()
+            carry = None
+
+            if item is STREAM_END:
+                await sse_queue.put(sse_event({'type': 'complete'}))
+                logger.info("Streaming complete!")
+                completed = True
+                break
+            if isinstance(item, Exception):
+                await sse_queue.put(sse_event({'type': 'error', 'message': str(item)}))
+                logger.error("Streaming error: %s", item)
+                break
+
+            level, text = item
+            if text is None:
+                sections[level] = []
+                await sse_queue.put(sse_event({'type': 'level_start', 'level': level}))
+                continue
 
-For EACH level, provide:
-## Key Concepts
-## Core Takeaways  
-## Important Details
-## Suggested Focus Areas
+            parts = [text]
+            size = len(text)
+            deadline = loop.time() + CONTENT_BATCH_SECONDS
+            while size < CONTENT_BATCH_CHARS:
+                item = await next_item(max(0.0, deadline - loop.time()))
+                if item is None:
+                    break
+                if isinstance(item, tuple) and item[0] == level and item[1] is not None:
+                    parts.append(item[1])
+                    size += len(item[1])
+                else:
+                    carry = item
+                    break
+            sections[level].extend(parts)
+            await sse_queue.put(sse_content("".join(parts), level))
+    finally:
+        if getter is not None:
+            getter.cancel()
+
+    await sse_queue.put(STREAM_END)
+    return completed
+
+
+def replay_summaries(summaries: dict):
+    """
+    Yield cached summaries as the same SSE events a live stream produces
+    """
+    for level, text in summaries.items():
+        yield sse_event({'type': 'level_start', 'level': level})
+        for start in range(0, len(text), REPLAY_CHUNK_CHARS):
+            yield sse_content(text[start:start + REPLAY_CHUNK_CHARS], level)
+    yield sse_event({'type': 'complete'})
 
-Format your response EXACTLY like this:
----LEVEL_0---
-[Complete beginner summary with ## section headers]
 
----LEVEL_1---
-[Beginner summary with ## section headers]
+async def generate_all_summaries_stream(transcript: str, language: str = 'en', knowledge_level: float = 0.0, skip_cache: bool = False):
+    """
+    Generate summaries starting from user's current knowledge level
+    All requested levels come from a single streamed request, split on ---LEVEL_N--- markers
+
+    Reading the API stream and SSE encoding run as separate tasks joined by
+    bounded queues, so this generator only hands ready-made frames to the
+    response while the next tokens are being read. Completed streams are
+    stored in the response cache and replayed on a (near-)duplicate request
+    unless skip_cache is set.
+    """
+    try:
+        # Convert knowledge level (0.0-1.0) to level index (0-4)
+        start_level = min(4, int(knowledge_level * 5))
+        logger.info("Starting streaming summary generation in %s from level %s...", language, start_level)
 
----LEVEL_2---
-[Intermediate summary with ## section headers]
+        language_instruction = LANGUAGE_INSTRUCTIONS.get(language, "")
 
----LEVEL_3---
-[Advanced summary with ## section headers]
+        # Send initial test message
+        yield sse_event({'type': 'test', 'message': 'Stream started'})
+
+        # Generate from user's level onwards
+        levels = range(start_level, 5)
+        cache_key = (start_level, language)
+
+        cached = None if skip_cache else await response_cache.alookup(transcript, "summary_stream", cache_key)
+        if cached is not None:
+            for frame in replay_summaries(cached):
+                yield frame
+            return
+
+        sections = {}
+        raw_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        sse_queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        tasks = [
+            asyncio.create_task(read_level_stream(transcript, levels, language_instruction, raw_queue)),
+            asyncio.create_task(encode_level_stream(raw_queue, sse_queue, sections)),
+        ]
+
+        try:
+            while True:
+                frame = await sse_queue.get()
+                if frame is STREAM_END:
+                    break
+                yield frame
+
+            if await tasks[1] and len(sections) == len(levels):
+                await response_cache.astore(transcript, "summary_stream", cache_key, {
+                    level: "".join(parts) for level, parts in sections.items()
+                })
+        finally:
+            # Stop reading from the API if the client went away
+            for task in tasks:
+                task.cancel()
 
----LEVEL_4---
-[Expert summary with ## section headers]"""
-            }]
-        ) as stream:
-            for text in stream.text_stream:
-                buffer += text
-                
-                # Check if we hit a level marker
-                if '---LEVEL_' in buffer:
-                    # Extract level number
-                    parts = buffer.split('---LEVEL_')
-                    if len(parts) > 1:
-                        level_part = parts[-1].split('---')[0]
-                        if level_part.strip().isdigit():
-                            new_level = level_part.strip()
-                            if new_level != current_level:
-                                current_level = new_level
-                                # Send level change event
-                                yield f"data: {json_module.dumps({'type': 'level_start', 'level': current_level})}\n\n"
-                
-                # Send the text chunk
-                yield f"data: {json_module.dumps({'type': 'content', 'text': text, 'level': current_level})}\n\n"
-        
-        # Send completion event
-        yield f"data: {json_module.dumps({'type': 'complete'})}\n\n"
-        print("Streaming complete!")
-        
     except Exception as e:
-        error_data = json_module.dumps({'type': 'error', 'message': str(e)})
-        yield f"data: {error_data}\n\n"
-        print(f"Streaming error: {str(e)}")
+        yield sse_event({'type': 'error', 'message': str(e)})
+        logger.error("Streaming error: %s", e)
 
 
-def generate_all_summaries(transcript: str) -> dict:
+async def coalesce_sse(
+    frames,
+    max_delay: float = SSE_COALESCE_SECONDS,
+    max_bytes: int = SSE_COALESCE_BYTES,
+    heartbeat: float = SSE_HEARTBEAT_SECONDS
+):
     """
-    Generate 5 adaptive summaries at once (one API call)
-    Returns dict with levels 0, 1, 2, 3, 4 as keys
+    Batch small SSE frames into fewer, larger writes
+
+    Frames are buffered until max_delay has passed since the first buffered
+    frame or max_bytes is reached. The deadline is also enforced while
+    waiting for the next frame, so a stalled stream still flushes on time.
+    A heartbeat comment is sent whenever nothing arrived for heartbeat seconds.
     """
+    loop = asyncio.get_running_loop()
+    iterator = frames.__aiter__()
+    buffer = bytearray()
+    deadline = None
+    pending = None
+
     try:
-        print("Generating 5-level adaptive summaries...")
-        message = anthropic_client.messages.create(
-            model="claude-sonnet-4-5-20250929",  # Most advanced model available
-            max_tokens=8000,
-            messages=[{
-                "role": "user",
-                "content": f"""Create 5 different summaries of this lecture transcript, each adapted to a different knowledge level. Each summary should be DISTINCTLY DIFFERENT and avoid repeating information unnecessarily.
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = heartbeat if deadline is None else max(0.0, deadline - loop.time())
+            done, _ = await asyncio.wait((pending,), timeout=timeout)
+
+            if not done and deadline is None:
+                yield SSE_HEARTBEAT
+                continue
 
-**LEVEL 0 - COMPLETE BEGINNER (0.0-0.2)**
-Assumes absolutely no prior knowledge. Define every technical term in simple language. Use everyday analogies. Build from first principles. Be patient and thorough.
+            if done:
+                task, pending = pending, None
+                try:
+                    buffer += task.result()
+                except StopAsyncIteration:
+                    break
+                if deadline is None:
+                    deadline = loop.time() + max_delay
 
-**LEVEL 1 - BEGINNER (0.2-0.4)**  
-Assumes basic familiarity with the topic area. Still explain technical terms but can assume some foundational concepts. Use clear examples.
+            if len(buffer) >= max_bytes or (deadline is not None and loop.time() >= deadline):
+                yield bytes(buffer)
+                buffer.clear()
+                deadline = None
 
-**LEVEL 2 - INTERMEDIATE (0.4-0.6)**
-Assumes solid foundational knowledge. Use standard technical terminology. Focus on connections between concepts and practical applications.
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        if pending is not None:
+            pending.cancel()
 
-**LEVEL 3 - ADVANCED (0.6-0.8)**
-Assumes strong technical background. Use advanced terminology freely. Focus on nuances, implications, and deeper understanding.
 
-**LEVEL 4 - EXPERT (0.8-1.0)**
-Assumes expert-level knowledge. Be concise and dense. Focus on cutting-edge insights, edge cases, research implications, and what's novel or significant.
+def summary_level_params(transcript: str, level: int) -> dict:
+    """
+    Request parameters for one level's summary (shared by /process and batch precompute)
+    """
+    return {
+        "model": "claude-sonnet-4-5-20250929",  # Most advanced model available
+        "max_tokens": SUMMARY_LEVEL_MAX_TOKENS,
+        "messages": [{
+            "role": "user",
+            "content": [transcript_block(transcript), {"type": "text", "text": build_levels_prompt(range(level, level + 1), "")}]
+        }]
+    }
 
-Transcript:
-{transcript}
 
-For EACH level, provide:
-## Key Concepts
-## Core Takeaways  
-## Important Details
-## Suggested Focus Areas
+def summary_level_text(response_text: str) -> str:
+    """
+    Drop the ---LEVEL_N--- marker the summary prompt asks for
+    """
+    return LEVEL_MARKER.split(response_text)[-1].strip()
 
-Format your response EXACTLY like this:
----LEVEL_0---
-[Complete beginner summary with ## section headers]
 
----LEVEL_1---
-[Beginner summary with ## section headers]
+async def generate_summary_level(transcript: str, level: int) -> str:
+    """
+    Generate one level's summary (one API call, bounded by summary_level_semaphore)
+    """
+    async with summary_level_semaphore:
+        message = await async_anthropic_client.messages.create(**summary_level_params(transcript, level))
 
----LEVEL_2---
-[Intermediate summary with ## section headers]
+    return summary_level_text(message.content[0].text)
 
----LEVEL_3---
-[Advanced summary with ## section headers]
 
----LEVEL_4---
-[Expert summary with ## section headers]"""
-            }]
-        )
-        
-        full_response = message.content[0].text
-        print("All summaries generated successfully!")
-        print(f"Response length: {len(full_response)} characters")
-        
-        # Debug: Print first 500 chars to see format
-        print("Response preview:", full_response[:500])
-        
-        # Parse the response into 5 separate summaries
-        summaries = {}
-        parts = full_response.split('---LEVEL_')
-        
-        print(f"Split into {len(parts)} parts")
-        
-        for i, part in enumerate(parts[1:]):  # Skip the first empty split
-            if not part.strip():
-                print(f"Part {i} is empty, skipping")
-                continue
-            lines = part.strip().split('\n', 1)
-            if len(lines) < 2:
-                print(f"Part {i} has insufficient lines, skipping")
-                continue
-            level_num = lines[0].replace('---', '').strip()
-            summary_content = lines[1].strip()
-            summaries[level_num] = summary_content
-            print(f"Parsed level {level_num}, length: {len(summary_content)} chars")
-        
+async def generate_all_summaries(transcript: str) -> dict:
+    """
+    Generate 5 adaptive summaries concurrently (one API call per level)
+    Returns dict with levels 0, 1, 2, 3, 4 as keys
+    """
+    cached = await response_cache.alookup(transcript, "summaries")
+    if cached is not None:
+        return cached
+
+    try:
+        logger.info("Generating 5-level adaptive summaries...")
+        results = await asyncio.gather(*(generate_summary_level(transcript, level) for level in range(5)))
+        summaries = {str(level): summary for level, summary in enumerate(results) if summary}
+        logger.info("All summaries generated successfully!")
+        logger.debug("Parsed levels: %s", {level: len(content) for level, content in summaries.items()})
+
         # Ensure we have all 5 levels
         if len(summaries) != 5:
-            print(f"Warning: Expected 5 summaries, got {len(summaries)}")
-            print(f"Available keys: {list(summaries.keys())}")
-        
+            logger.warning("Expected 5 summaries, got %s", len(summaries))
+            logger.debug("Available keys: %s", list(summaries.keys()))
+        else:
+            await response_cache.astore(transcript, "summaries", None, summaries)
+
         return summaries
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Summary generation failed: {str(e)}")
+
+
+@app.on_event("startup")
+def load_models():
     """
-    Generate natural language quiz questions based on knowledge level
-    Returns list of questions
-    """
-    level_descriptions = {
-        0: "complete beginner with no prior knowledge",
-        1: "beginner with basic familiarity",
-        2: "intermediate learner with solid foundation",
-        3: "advanced learner with strong background",
-        4: "expert with deep technical knowledge"
-    }
-    
-    try:
-        print(f"Generating quiz for level {knowledge_level}...")
-        message = anthropic_client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=2000,
-            messages=[{
-                "role": "user",
-                "content": f"""Based on this lecture transcript, create 4 natural language quiz questions for a {level_descriptions[knowledge_level]}.
+    Load the Whisper model and the response cache once per server process
 
-These questions should:
-- Be open-ended (require explanation, not yes/no)
-- Test understanding at the appropriate depth for this level
-- Encourage critical thinking
-- Be answerable based on the lecture content
+    Not done at import: spawned PDF worker processes re-import this module
+    (as __mp_main__ under python3 main.py) and must not load either model.
+    """
+    global transcriber, response_cache
+    transcriber = AudioTranscriber()
+    response_cache = create_response_cache()
 
-Transcript:
-{transcript}
 
-Format your response as a JSON array of questions ONLY, like this:
-[
-  "Question 1 text here?",
-  "Question 2 text here?",
-  "Question 3 text here?",
-  "Question 4 text here?"
-]
+@app.on_event("shutdown")
+def save_response_cache():
+    """
+    Persist the response cache so it survives restarts
+    """
+    response_cache.save()
 
-Return ONLY the JSON array, no other text."""
-            }]
-        )
-        
-        response_text = message.content[0].text.strip()
-        print("Quiz generated successfully!")
-        
-        # Parse JSON response
-        import json
-        questions = json.loads(response_text)
-        
-        return questions
-        
-    except Exception as e:
-        print(f"Quiz generation error: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Quiz generation failed: {str(e)}")
+
+@app.on_event("shutdown")
+async def close_anthropic_client():
+    """
+    Close pooled connections to the Anthropic API
+    """
+    await anthropic_http_client.aclose()
+
+
+@app.on_event("shutdown")
+async def close_session_store():
+    """
+    Close the session store's connection (Redis)
+    """
+    await session_store.close()
+
+
+@functools.lru_cache(maxsize=1)
+def render_index() -> str:
+    """
+    Render the main page once (index.html has no per-request template variables)
+    """
+    return templates.get_template("index.html").render()
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -696,65 +1023,111 @@ async def root(request: Request):
     """
     Serve the main HTML interface
     """
-    return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(render_index())
+
+
+def check_transcript(transcript: str) -> str:
+    """
+    Reject a transcript under 50 characters
+
+    Raises:
+        HTTPException: 400 if the transcript is too short
+    """
+    if not transcript or len(transcript.strip()) < 50:
+        raise HTTPException(status_code=400, detail="Transcript must be at least 50 characters")
+    return transcript
+
+
+async def resolve_transcript(use_memory: bool, session_id: Optional[str], transcript: str) -> str:
+    """
+    Pick the transcript from session memory or the request and validate it
+
+    Raises:
+        HTTPException: 400 if there is no memory or the transcript is under 50 characters
+    """
+    if not use_memory:
+        return check_transcript(transcript)
+
+    transcript = await session_store.get_combined_text(session_id) if session_id else None
+    if transcript is None:
+        logger.debug("No session memory for ID: %s", session_id)
+        raise HTTPException(status_code=400, detail="No memory found. Please add sources first.")
+
+    if not transcript or len(transcript.strip()) < 50:
+        raise HTTPException(status_code=400, detail="Memory is empty. Please add sources first.")
+    return transcript
+
+
+def valid_transcript(transcript: str = Form(...)) -> str:
+    """
+    Dependency for form endpoints: the posted transcript, rejected before the handler runs if too short
+    """
+    return check_transcript(transcript)
+
+
+async def lecture_request(
+    request: Request,
+    session_id: Optional[str] = Cookie(default=None)
+) -> dict:
+    """
+    Dependency for JSON endpoints that work on a lecture transcript
+
+    Parses the body once and resolves the transcript from session memory
+    (use_memory) or the body, so the handler only runs on valid input.
+
+    Returns:
+        dict: Request body with "transcript" set to the resolved text
+    """
+    body = await request.json()
+
+    # Check for session_id in request body first, then fall back to cookie
+    if not session_id:
+        session_id = body.get('session_id')
+
+    body['transcript'] = await resolve_transcript(body.get('use_memory', False), session_id, body.get('transcript', ''))
+    return body
+
 
 @app.post("/process_stream")
+@limiter.limit(config.STREAM_RATE_LIMIT)
 async def process_lecture_stream(
     request: Request,
-    session_id: Optional[str] = Cookie(default=None)
+    body: dict = Depends(lecture_request)
 ):
     """
     Process lecture transcript and stream adaptive summaries starting from user's level
     Supports both direct transcript input and memory-based content
     """
     try:
-        body = await request.json()
-        use_memory = body.get('use_memory', False)
+        transcript = body['transcript']
         language = body.get('language', 'en')
         knowledge_level = body.get('knowledge_level', 0.0)  # Get user's current level
-
-        # Check for session_id in request body first, then fall back to cookie
-        if not session_id:
-            session_id = body.get('session_id')
-
-        # Get transcript from memory or request body
-        if use_memory:
-            if not session_id or session_id not in lecture_memory:
-                print(f"Session check - ID: {session_id}, In memory: {session_id in lecture_memory if session_id else False}")
-                print(f"Available sessions: {list(lecture_memory.keys())}")
-                raise HTTPException(status_code=400, detail="No memory found. Please add sources first.")
-
-            transcript = lecture_memory[session_id]["combined_text"]
-            if not transcript or len(transcript.strip()) < 50:
-                raise HTTPException(status_code=400, detail="Memory is empty. Please add sources first.")
-        else:
-            transcript = body.get('transcript', '')
-            # Validate transcript
-            if not transcript or len(transcript.strip()) < 50:
-                raise HTTPException(status_code=400, detail="Transcript must be at least 50 characters")
+        skip_cache = body.get('skip_cache', False)  # Force a fresh generation
 
         async def safe_stream_wrapper():
             """Wrapper to handle disconnection gracefully"""
             try:
-                async for chunk in generate_all_summaries_stream(transcript, language, knowledge_level):
-                    # Check if client is still connected
-                    if await request.is_disconnected():
-                        print("Client disconnected, stopping stream")
-                        break
-                    yield chunk
+                # Tell the client it is waiting for a free generation slot
+                if stream_semaphore.locked():
+                    yield sse_event({'type': 'queued'})
+
+                async with stream_semaphore:
+                    async for chunk in generate_all_summaries_stream(transcript, language, knowledge_level, skip_cache):
+                        # Check if client is still connected
+                        if await request.is_disconnected():
+                            logger.info("Client disconnected, stopping stream")
+                            break
+                        yield chunk
             except Exception as e:
-                import traceback
-                error_details = traceback.format_exc()
-                print(f"Stream error: {str(e)}")
-                print(f"Stream error traceback:\n{error_details}")
+                logger.exception("Stream error: %s", e)
                 # Try to send error to client if still connected
                 if not await request.is_disconnected():
                     error_message = str(e) if str(e) else "An error occurred while generating the summary"
                     error_data = {'type': 'error', 'message': error_message}
-                    yield f"data: {json_module.dumps(error_data)}\n\n"
+                    yield sse_event(error_data)
 
         return StreamingResponse(
-            safe_stream_wrapper(),
+            coalesce_sse(safe_stream_wrapper()),
             media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
@@ -763,39 +1136,168 @@ async def process_lecture_stream(
             }
         )
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Streaming error: {str(e)}")
-        print(f"Full traceback:\n{error_details}")
+        logger.exception("Streaming error: %s", e)
         raise HTTPException(status_code=500, detail=str(e) if str(e) else "Internal server error")
 
-@app.post("/process")
+async def run_summary_job(transcript: str) -> dict:
+    """
+    Background job body for /process: generate all 5 summaries
+    """
+    summaries = await generate_all_summaries(transcript)
+    return {
+        "success": True,
+        "status": "complete",
+        "summaries": summaries,
+        "transcript_length": len(transcript)
+    }
+
+
+@app.post("/process", status_code=202)
 async def process_lecture(
-    transcript: str = Form(...)
+    transcript: str = Depends(valid_transcript)
 ):
     """
-    Process lecture transcript and generate all 5 adaptive summaries at once
+    Start generating all 5 adaptive summaries in the background
+
+    Returns a job_id to poll at /process/{job_id}; the request does not
+    wait for the generation. Resubmitting the same transcript is answered
+    from the response cache.
     """
-    # Validate transcript
-    if not transcript or len(transcript.strip()) < 50:
-        raise HTTPException(status_code=400, detail="Transcript must be at least 50 characters")
-    
-    try:
-        # Generate all 5 summaries in one API call
-        summaries = generate_all_summaries(transcript)
-        
-        return JSONResponse({
-            "success": True,
-            "summaries": summaries,
-            "transcript_length": len(transcript)
-        })
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    job_id = start_job("process", run_summary_job(transcript))
+
+    return ORJSONResponse({"success": True, "status": "pending", "job_id": job_id}, status_code=202)
+
+
+def start_job(kind: str, job) -> str:
+    """
+    Run a coroutine as a background job and return its id for polling
+
+    Raises:
+        HTTPException: 503 if the table is full of pending jobs
+    """
+    # Drop the oldest finished jobs once the table is full
+    for old_id in [job_id for job_id, (_, task) in summary_jobs.items() if task.done()]:
+        if len(summary_jobs) < MAX_SUMMARY_JOBS:
+            break
+        del summary_jobs[old_id]
+
+    if len(summary_jobs) >= MAX_SUMMARY_JOBS:
+        job.close()
+        raise HTTPException(status_code=503, detail="Too many jobs in progress, please retry later")
+
+    job_id = uuid.uuid4().hex
+    summary_jobs[job_id] = (kind, asyncio.create_task(job))
+    return job_id
+
+
+@app.get("/process/{job_id}")
+async def get_process_result(job_id: str):
+    """
+    Poll a /process job: pending, or the generated summaries
+    """
+    return job_result("process", job_id)
+
+
+def job_result(kind: str, job_id: str) -> ORJSONResponse:
+    """
+    Response for a background job of this kind: pending, its result, or its error
+    """
+    job_kind, task = summary_jobs.get(job_id, (None, None))
+    if job_kind != kind:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+
+    if not task.done():
+        return ORJSONResponse({"success": True, "status": "pending", "job_id": job_id})
+
+    error = task.exception()
+    if error is not None:
+        detail = error.detail if isinstance(error, HTTPException) else str(error)
+        raise HTTPException(status_code=500, detail=detail)
+
+    return ORJSONResponse(task.result())
+
+
+async def run_precompute_job(transcript: str) -> dict:
+    """
+    Background job body for /precompute_session: all 5 summaries and quizzes in one message batch
+
+    Batched requests cost half as much as interactive ones but may take
+    minutes to run, so results go into the response cache where /process
+    and /generate_quiz pick them up.
+    """
+    requests = []
+    if await response_cache.alookup(transcript, "summaries") is None:
+        requests.extend(
+            {"custom_id": f"summary-{level}", "params": summary_level_params(transcript, level)}
+            for level in range(5)
+        )
+    for level in range(5):
+        if await response_cache.alookup(transcript, "quiz", level) is None:
+            requests.append({"custom_id": f"quiz-{level}", "params": quiz_params(transcript, level)})
+
+    if not requests:
+        return {"success": True, "status": "complete", "precomputed": [], "failed": []}
+
+    batch = await async_anthropic_client.messages.batches.create(requests=requests)
+    logger.info("Submitted message batch %s (%s requests)", batch.id, len(requests))
+    while batch.processing_status != "ended":
+        await asyncio.sleep(PRECOMPUTE_POLL_SECONDS)
+        batch = await async_anthropic_client.messages.batches.retrieve(batch.id)
+
+    summaries, precomputed, failed = {}, [], []
+    async for entry in await async_anthropic_client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            failed.append(entry.custom_id)
+            continue
+        kind, level = entry.custom_id.split("-")
+        response_text = entry.result.message.content[0].text
+        try:
+            if kind == "summary":
+                summaries[level] = summary_level_text(response_text)
+            else:
+                await response_cache.astore(transcript, "quiz", int(level), tuple(parse_json_response(response_text)))
+            precomputed.append(entry.custom_id)
+        except Exception as e:
+            logger.warning("Could not parse batch result %s: %s", entry.custom_id, e)
+            failed.append(entry.custom_id)
+
+    if len(summaries) == 5:
+        await response_cache.astore(transcript, "summaries", None, {level: summaries[level] for level in sorted(summaries)})
+    logger.info("Message batch %s done: %s precomputed, %s failed", batch.id, len(precomputed), len(failed))
+
+    return {
+        "success": True,
+        "status": "complete",
+        "batch_id": batch.id,
+        "precomputed": sorted(precomputed),
+        "failed": sorted(failed)
+    }
+
+
+@app.post("/precompute_session", status_code=202)
+async def precompute_session(request: dict = Depends(lecture_request)):
+    """
+    Start precomputing summaries and quizzes for all levels via the Message Batches API
+
+    For the transcript or session memory (use_memory) in the JSON body.
+    Returns a job_id to poll at /precompute_session/{job_id}; once complete,
+    the matching /process and /generate_quiz calls are answered from the cache.
+    """
+    job_id = start_job("precompute", run_precompute_job(request['transcript']))
+
+    return ORJSONResponse({"success": True, "status": "pending", "job_id": job_id}, status_code=202)
+
+
+@app.get("/precompute_session/{job_id}")
+async def get_precompute_result(job_id: str):
+    """
+    Poll a /precompute_session job: pending, or which results were precomputed
+    """
+    return job_result("precompute", job_id)
 
 @app.post("/generate_quiz")
 async def create_quiz(
-    transcript: str = Form(...),
+    transcript: str = Depends(valid_transcript),
     knowledge_level: int = Form(...)
 ):
     """
@@ -803,14 +1305,11 @@ async def create_quiz(
     """
     if not 0 <= knowledge_level <= 4:
         raise HTTPException(status_code=400, detail="Knowledge level must be between 0 and 4")
-    
-    if not transcript or len(transcript.strip()) < 50:
-        raise HTTPException(status_code=400, detail="Transcript must be at least 50 characters")
-    
+
     try:
-        questions = generate_quiz(transcript, knowledge_level)
+        questions = await generate_quiz(transcript, knowledge_level)
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "questions": questions,
             "knowledge_level": knowledge_level
@@ -822,51 +1321,30 @@ async def create_quiz(
 
 @app.post("/generate_adaptive_question")
 async def create_adaptive_question(
-    request: Request,
-    session_id: Optional[str] = Cookie(default=None)
+    body: dict = Depends(lecture_request)
 ):
     """
     Generate a single question at specific difficulty for adaptive quiz
     Supports both direct transcript input and memory-based content
     """
     try:
-        body = await request.json()
-        use_memory = body.get('use_memory', False)
+        transcript = body['transcript']
         difficulty_level = body.get('difficulty_level', 0)
         previous_questions = body.get('previous_questions', [])
 
         if not 0 <= difficulty_level <= 4:
             raise HTTPException(status_code=400, detail="Difficulty level must be between 0 and 4")
 
-        # Check for session_id in request body first, then fall back to cookie
-        if not session_id:
-            session_id = body.get('session_id')
+        question = await generate_single_question(transcript, difficulty_level, previous_questions)
 
-        # Get transcript from memory or request body
-        if use_memory:
-            if not session_id or session_id not in lecture_memory:
-                raise HTTPException(status_code=400, detail="No memory found. Please add sources first.")
-
-            transcript = lecture_memory[session_id]["combined_text"]
-            if not transcript or len(transcript.strip()) < 50:
-                raise HTTPException(status_code=400, detail="Memory is empty. Please add sources first.")
-        else:
-            transcript = body.get('transcript', '')
-            if not transcript or len(transcript.strip()) < 50:
-                raise HTTPException(status_code=400, detail="Transcript must be at least 50 characters")
-
-        question = generate_single_question(transcript, difficulty_level, previous_questions)
-
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "question": question,
             "difficulty_level": difficulty_level
         })
 
     except Exception as e:
-        print(f"Error in generate_adaptive_question endpoint: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in generate_adaptive_question endpoint: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -887,25 +1365,13 @@ async def check_answer(
     if not answer or len(answer.strip()) < 5:
         raise HTTPException(status_code=400, detail="Answer must be at least 5 characters")
 
-    try:
-        # Get transcript from memory if use_memory is true
-        if use_memory.lower() == 'true':
-            # Use session_id from form or cookie
-            effective_session_id = session_id or cookie_session_id
-
-            if not effective_session_id or effective_session_id not in lecture_memory:
-                raise HTTPException(status_code=400, detail="No memory found. Please add sources first.")
-
-            transcript = lecture_memory[effective_session_id]["combined_text"]
-            if not transcript or len(transcript.strip()) < 50:
-                raise HTTPException(status_code=400, detail="Memory is empty. Please add sources first.")
-
-        if not transcript or len(transcript.strip()) < 50:
-            raise HTTPException(status_code=400, detail="Transcript is required")
+    # Get transcript from memory if use_memory is true (session_id from form or cookie)
+    transcript = await resolve_transcript(use_memory.lower() == 'true', session_id or cookie_session_id, transcript)
 
-        evaluation = evaluate_answer(question, answer, transcript, knowledge_level)
+    try:
+        evaluation = await evaluate_answer(question, answer, transcript, knowledge_level)
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "evaluation": evaluation
         })
@@ -914,9 +1380,46 @@ async def check_answer(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def ask_question_messages(transcript: str, question: str, knowledge_level: int, language: str) -> list:
+    """
+    Build the Claude messages for answering a student's question
+
+    Raises:
+        HTTPException: 400 if the question is under 5 characters
+    """
+    if not question or len(question.strip()) < 5:
+        raise HTTPException(status_code=400, detail="Question must be at least 5 characters")
+
+    language_instruction = LANGUAGE_INSTRUCTIONS.get(language, "")
+
+    return [{
+        "role": "user",
+        "content": [transcript_block(transcript), {"type": "text", "text": f"""{language_instruction}
+
+You are helping a {QUIZ_LEVEL_DESCRIPTIONS.get(knowledge_level, 'intermediate')} understand the lecture above.
+
+Student's Question: {question}
+
+Provide a clear, helpful answer tailored to their knowledge level. Be conversational and educational."""}]
+    }]
+
+
+def answer_digest(transcript: str, question: str, knowledge_level: int, language: str) -> str:
+    """
+    Exact cache key for an answer: SHA-256 of the level, language, question and transcript
+
+    Answers are cached by exact match only (a reworded or negated question
+    must not reuse an earlier answer); the answer kind is never embedded.
+    """
+    digest = hashlib.sha256(f"{knowledge_level}\0{language}\0{len(question)}\0".encode())
+    digest.update(question.encode("utf-8"))
+    digest.update(transcript.encode("utf-8"))
+    return digest.hexdigest()
+
+
 @app.post("/ask_question")
 async def ask_question(
-    transcript: str = Form(...),
+    transcript: str = Depends(valid_transcript),
     question: str = Form(...),
     knowledge_level: int = Form(...),
     language: str = Form(default='en')
@@ -924,114 +1427,239 @@ async def ask_question(
     """
     Answer a question about the transcript based on user's knowledge level in specified language
     """
-    if not question or len(question.strip()) < 5:
-        raise HTTPException(status_code=400, detail="Question must be at least 5 characters")
-    
-    if not transcript or len(transcript.strip()) < 50:
-        raise HTTPException(status_code=400, detail="Transcript required")
-    
-    level_descriptions = {
-        0: "complete beginner with no prior knowledge",
-        1: "beginner with basic familiarity",
-        2: "intermediate learner with solid foundation",
-        3: "advanced learner with strong background",
-        4: "expert with deep technical knowledge"
-    }
-    
-    language_names = {
-        'en': 'English',
-        'es': 'Spanish',
-        'fr': 'French',
-        'de': 'German',
-        'zh': 'Chinese',
-        'ja': 'Japanese',
-        'ar': 'Arabic',
-        'hi': 'Hindi',
-        'pt': 'Portuguese',
-        'ru': 'Russian'
-    }
-    
-    language_instruction = f"Respond in {language_names.get(language, 'English')}." if language != 'en' else ""
-    
+    messages = ask_question_messages(transcript, question, knowledge_level, language)
+
+    # Exactly the same question about the same transcript, level and language
+    answer_key = answer_digest(transcript, question, knowledge_level, language)
+    cached = response_cache.lookup(answer_key, "answer")
+    if cached is not None:
+        return ORJSONResponse({
+            "success": True,
+            "answer": cached
+        })
+
     try:
-        print(f"Answering question at level {knowledge_level} in {language}...")
-        message = anthropic_client.messages.create(
+        logger.info("Answering question at level %s in %s...", knowledge_level, language)
+        message = await async_anthropic_client.messages.create(
             model="claude-sonnet-4-5-20250929",
             max_tokens=1500,
-            messages=[{
-                "role": "user",
-                "content": f"""{language_instruction}
-
-You are helping a {level_descriptions.get(knowledge_level, 'intermediate')} understand this lecture.
-
-Lecture Transcript:
-{transcript}
-
-Student's Question: {question}
-
-Provide a clear, helpful answer tailored to their knowledge level. Be conversational and educational."""
-            }]
+            messages=messages
         )
         
         answer = message.content[0].text
-        print("Question answered successfully!")
+        logger.info("Question answered successfully!")
+        response_cache.store(answer_key, "answer", None, answer)
         
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "answer": answer
         })
         
     except Exception as e:
-        print(f"Question answering error: {str(e)}")
+        logger.error("Question answering error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/ask_question_stream")
+async def ask_question_stream(
+    transcript: str = Depends(valid_transcript),
+    question: str = Form(...),
+    knowledge_level: int = Form(...),
+    language: str = Form(default='en')
+):
+    """
+    Answer a question about the transcript, streaming the answer as it is generated
+    Events: content (text delta), complete, error
+    """
+    messages = ask_question_messages(transcript, question, knowledge_level, language)
+    answer_key = answer_digest(transcript, question, knowledge_level, language)
+
+    async def generate():
+        try:
+            cached = response_cache.lookup(answer_key, "answer")
+            if cached is not None:
+                yield sse_event({'type': 'content', 'text': cached})
+                yield sse_event({'type': 'complete'})
+                return
+
+            logger.info("Streaming answer at level %s in %s...", knowledge_level, language)
+            parts = []
+            async with async_anthropic_client.messages.stream(
+                model="claude-sonnet-4-5-20250929",
+                max_tokens=1500,
+                messages=messages
+            ) as stream:
+                async for text in stream.text_stream:
+                    parts.append(text)
+                    yield sse_event({'type': 'content', 'text': text})
+
+            yield sse_event({'type': 'complete'})
+            logger.info("Question answered successfully!")
+            response_cache.store(answer_key, "answer", None, "".join(parts))
+
+        except Exception as e:
+            logger.error("Question answering error: %s", e)
+            yield sse_event({'type': 'error', 'message': str(e)})
+
+    return StreamingResponse(
+        coalesce_sse(generate()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def remember_extraction(key: tuple, entry: tuple):
+    """
+    Cache an upload's extraction, evicting the least recently used past EXTRACTED_CACHE_CHARS
+    """
+    extracted_documents[key] = entry
+    extracted_documents.move_to_end(key)
+    total_chars = sum(len(text) for text, _, _ in extracted_documents.values())
+    while total_chars > EXTRACTED_CACHE_CHARS and len(extracted_documents) > 1:
+        _, (evicted_text, _, _) = extracted_documents.popitem(last=False)
+        total_chars -= len(evicted_text)
+
+
 @app.post("/upload_document")
-async def upload_document(file: UploadFile = File(...)):
+async def upload_document(file: UploadFile = File(...), include_metadata: bool = False):
     """
     Upload and extract text from document files
     Supports: PDF, DOCX, PPTX, TXT
     Returns extracted text for review before summarization
+    (plus PDF metadata when include_metadata is set, from the same parse)
     """
     try:
-        print(f"Received document upload: {file.filename}")
-
-        # Validate file
-        file_bytes = await FileValidator.validate_document(file)
-
-        # Extract text based on file type
-        extracted_text, file_type = DocumentExtractor.extract_text(file_bytes, file.filename)
-
-        print(f"Successfully extracted {len(extracted_text)} characters from {file_type}")
+        logger.info("Received document upload: %s", file.filename)
 
         # Determine simple type for frontend
         extension = file.filename.lower().split('.')[-1]
-        simple_type = {
-            'pdf': 'pdf',
-            'doc': 'document',
-            'docx': 'document',
-            'ppt': 'presentation',
-            'pptx': 'presentation',
-            'txt': 'text'
-        }.get(extension, 'document')
-
-        return JSONResponse({
+        simple_type = DOCUMENT_TYPES.get(extension, 'document')
+
+        # Validate file (spooled to a temporary file, on disk when large)
+        document, digest = await FileValidator.validate_document(file)
+        with document:
+            # Same file uploaded before: reuse its extracted text
+            cache_key = (digest, extension)
+            cached = extracted_documents.get(cache_key)
+            if cached is not None and (cached[2] is not None or not include_metadata or simple_type != 'pdf'):
+                extracted_documents.move_to_end(cache_key)
+                extracted_text, file_type, metadata = cached
+                logger.info("Reusing extracted text for %s (%s)", file.filename, digest[:12])
+            else:
+                metadata = None
+                if simple_type == 'pdf':
+                    # PDFium is not thread-safe: every call goes through its one worker
+                    loop = asyncio.get_running_loop()
+                    if include_metadata:
+                        # Text and metadata from one parse of the PDF
+                        extracted_text, metadata = await loop.run_in_executor(
+                            PDF_EXECUTOR, PDFExtractor.extract_all, document
+                        )
+                        file_type = 'PDF'
+                    else:
+                        extracted_text, file_type = await loop.run_in_executor(
+                            PDF_EXECUTOR, DocumentExtractor.extract_text, document, file.filename
+                        )
+                else:
+                    # Extract text based on file type
+                    extracted_text, file_type = await asyncio.to_thread(
+                        DocumentExtractor.extract_text, document, file.filename
+                    )
+                remember_extraction(cache_key, (extracted_text, file_type, metadata))
+
+                logger.info("Successfully extracted %s characters from %s", len(extracted_text), file_type)
+
+        result = {
             "success": True,
             "text": extracted_text,
             "filename": file.filename,
             "character_count": len(extracted_text),
             "type": simple_type,
             "file_type": file_type
-        })
+        }
+        if metadata is not None:
+            result["metadata"] = metadata
+
+        return ORJSONResponse(result)
 
     except HTTPException as e:
-        print(f"Document upload error: {e.detail}")
+        logger.warning("Document upload error: %s", e.detail)
         raise e
     except Exception as e:
-        print(f"Unexpected document error: {str(e)}")
+        logger.error("Unexpected document error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/upload_document_stream")
+async def upload_document_stream(file: UploadFile = File(...)):
+    """
+    Upload and extract text from document files with streaming progress
+    PDFs report each page as it is read; other formats report start and finish
+    """
+    async def generate():
+        try:
+            logger.info("Received document upload: %s", file.filename)
+
+            # Send initial status
+            yield sse_event({'status': 'uploading', 'message': 'Uploading document...'})
+
+            # Validate file (spooled to a temporary file, on disk when large)
+            document, digest = await FileValidator.validate_document(file)
+            extension = file.filename.lower().split('.')[-1]
+            simple_type = DOCUMENT_TYPES.get(extension, 'document')
+
+            with document:
+                # Same file uploaded before: reuse its extracted text
+                cache_key = (digest, extension)
+                cached = extracted_documents.get(cache_key)
+                if cached is not None:
+                    extracted_documents.move_to_end(cache_key)
+                    extracted_text, file_type, _ = cached
+                    logger.info("Reusing extracted text for %s (%s)", file.filename, digest[:12])
+                elif simple_type == 'pdf':
+                    extracted_text, file_type = None, 'PDF'
+                    # Closed on leaving, so the PDF is closed (on PDF_EXECUTOR) before the spool
+                    async with contextlib.aclosing(PDFExtractor.extract_text_streaming(document)) as pages:
+                        async for page_data in pages:
+                            if page_data["type"] == "page":
+                                yield sse_event({
+                                    'status': 'extracting',
+                                    'page': page_data["page"],
+                                    'total_pages': page_data["total_pages"]
+                                })
+                            elif page_data["type"] == "complete":
+                                extracted_text = page_data["text"]
+                            elif page_data["type"] == "error":
+                                raise Exception(page_data["message"])
+                    remember_extraction(cache_key, (extracted_text, file_type, None))
+                else:
+                    yield sse_event({'status': 'extracting', 'message': 'Extracting text...'})
+                    extracted_text, file_type = await asyncio.to_thread(
+                        DocumentExtractor.extract_text, document, file.filename
+                    )
+                    remember_extraction(cache_key, (extracted_text, file_type, None))
+
+            logger.info("Successfully extracted %s characters from %s", len(extracted_text), file_type)
+
+            yield sse_event({
+                'status': 'complete',
+                'text': extracted_text,
+                'filename': file.filename,
+                'character_count': len(extracted_text),
+                'type': simple_type,
+                'file_type': file_type
+            })
+
+        except HTTPException as e:
+            logger.warning("Document upload error: %s", e.detail)
+            yield sse_event({'status': 'error', 'message': e.detail})
+        except Exception as e:
+            logger.error("Document extraction error: %s", e)
+            yield sse_event({'status': 'error', 'message': str(e)})
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
 @app.post("/upload_pdf")
 async def upload_pdf(file: UploadFile = File(...)):
     """
@@ -1049,48 +1677,48 @@ async def upload_audio_stream(
     """
     Upload and transcribe audio file with streaming progress
     """
-    import json
-
     async def generate():
+        audio_path = None
         try:
-            print(f"Received audio upload: {file.filename} (language: {language})")
+            logger.info("Received audio upload: %s (language: %s)", file.filename, language)
 
             # Send initial status
-            yield f"data: {json.dumps({'status': 'uploading', 'message': 'Processing audio file...'})}\n\n"
+            yield sse_event({'status': 'uploading', 'message': 'Processing audio file...'})
 
-            # Validate file
-            audio_bytes = await FileValidator.validate_audio(file)
+            # Validate file (spooled to a temp file on disk)
+            audio_path = await FileValidator.validate_audio(file)
 
-            yield f"data: {json.dumps({'status': 'validating', 'message': 'File validated, starting transcription...'})}\n\n"
+            yield sse_event({'status': 'validating', 'message': 'File validated, starting transcription...'})
 
             # Map language codes
             whisper_language = language if language != 'en' else None
 
-            yield f"data: {json.dumps({'status': 'transcribing', 'message': 'Transcribing audio...'})}\n\n"
+            yield sse_event({'status': 'transcribing', 'message': 'Transcribing audio...'})
 
             # Stream transcription segments
             async for segment_data in transcriber.transcribe_audio_streaming(
-                audio_bytes,
-                file.filename,
+                audio_path,
                 language=whisper_language
             ):
                 if segment_data["type"] == "segment":
                     # Send segment to frontend for word-by-word display
-                    yield f"data: {json.dumps({'status': 'segment', **segment_data})}\n\n"
+                    yield sse_event({'status': 'segment', **segment_data})
                 elif segment_data["type"] == "complete":
                     # Transcription complete
-                    yield f"data: {json.dumps({'status': 'complete', 'filename': file.filename})}\n\n"
+                    yield sse_event({'status': 'complete', 'filename': file.filename})
                 elif segment_data["type"] == "error":
                     raise Exception(segment_data["message"])
 
-            print("Transcription streaming complete")
+            logger.info("Transcription streaming complete")
 
         except HTTPException as e:
             error = {"status": "error", "message": e.detail}
-            yield f"data: {json.dumps(error)}\n\n"
+            yield sse_event(error)
         except Exception as e:
             error = {"status": "error", "message": str(e)}
-            yield f"data: {json.dumps(error)}\n\n"
+            yield sse_event(error)
+        finally:
+            FileValidator.remove_temp_file(audio_path)
 
     return StreamingResponse(generate(), media_type="text/event-stream")
 
@@ -1103,11 +1731,12 @@ async def upload_audio(
     Upload and transcribe audio file (non-streaming version for compatibility)
     Returns transcribed text for review before summarization
     """
+    audio_path = None
     try:
-        print(f"Received audio upload: {file.filename} (language: {language})")
+        logger.info("Received audio upload: %s (language: %s)", file.filename, language)
 
-        # Validate file
-        audio_bytes = await FileValidator.validate_audio(file)
+        # Validate file (spooled to a temp file on disk)
+        audio_path = await FileValidator.validate_audio(file)
 
         # Map language codes (Whisper supports: en, es, fr, de, zh, ja, ar, hi, pt, ru)
         # Frontend uses same codes as Whisper
@@ -1115,14 +1744,13 @@ async def upload_audio(
 
         # Transcribe audio
         transcribed_text = await transcriber.transcribe_audio(
-            audio_bytes,
-            file.filename,
+            audio_path,
             language=whisper_language
         )
 
-        print(f"Successfully transcribed {len(transcribed_text)} characters from audio")
+        logger.info("Successfully transcribed %s characters from audio", len(transcribed_text))
 
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "text": transcribed_text,
             "filename": file.filename,
@@ -1132,11 +1760,13 @@ async def upload_audio(
         })
 
     except HTTPException as e:
-        print(f"Audio upload error: {e.detail}")
+        logger.warning("Audio upload error: %s", e.detail)
         raise e
     except Exception as e:
-        print(f"Unexpected audio error: {str(e)}")
+        logger.error("Unexpected audio error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        FileValidator.remove_temp_file(audio_path)
 
 
 # ============================================================================
@@ -1161,6 +1791,14 @@ async def add_to_memory(
 
         if not text or len(text) < 10:
             raise HTTPException(status_code=400, detail="Content must be at least 10 characters")
+        if len(text) > config.MAX_SOURCE_CHARS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Content too long. Maximum length: {config.MAX_SOURCE_CHARS:,} characters"
+            )
+        if source_type not in SOURCE_TYPE_LABELS:
+            supported_types = ", ".join(SOURCE_TYPE_LABELS)
+            raise HTTPException(status_code=400, detail=f"Unsupported source type. Supported types: {supported_types}")
 
         # Check for session_id in request body first, then fall back to cookie
         if not session_id:
@@ -1169,9 +1807,9 @@ async def add_to_memory(
         # Generate session ID if not exists
         if not session_id:
             session_id = str(uuid.uuid4())
-            print(f"Creating new session: {session_id}")
+            logger.info("Creating new session: %s", session_id)
         else:
-            print(f"Using existing session: {session_id}")
+            logger.debug("Using existing session: %s", session_id)
 
         # Always set the cookie to ensure it's refreshed
         response.set_cookie(
@@ -1183,13 +1821,9 @@ async def add_to_memory(
             path="/"
         )
 
-        # Initialize memory for session if not exists
-        if session_id not in lecture_memory:
-            lecture_memory[session_id] = {"sources": [], "combined_text": ""}
-            print(f"Initialized new memory for session: {session_id}")
-
         # Create source entry
         source_entry = {
+            "id": str(uuid.uuid4()),
             "type": source_type,
             "filename": filename,
             "text": text,
@@ -1197,36 +1831,31 @@ async def add_to_memory(
             "preview": text[:200] + "..." if len(text) > 200 else text
         }
 
-        # Add to memory
-        lecture_memory[session_id]["sources"].append(source_entry)
-
-        # Rebuild combined text with source labels
-        combined_parts = []
-        for idx, source in enumerate(lecture_memory[session_id]["sources"], 1):
-            type_label = {
-                "text": "Text Input",
-                "pdf": "PDF Document",
-                "audio": "Audio Transcription"
-            }.get(source["type"], "Unknown Source")
-
-            combined_parts.append(f"=== Source {idx}: {type_label} - {source['filename']} ===\n\n{source['text']}\n\n")
-
-        lecture_memory[session_id]["combined_text"] = "\n".join(combined_parts)
+        # Add to memory (creating it if needed), appending the new source's
+        # labelled block; earlier blocks are unchanged. Rejected, leaving the
+        # session untouched, if the block would overfill it
+        try:
+            source_count, combined_length = await session_store.append_source(session_id, source_entry)
+        except MemoryFullError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Memory is full (maximum {config.MAX_MEMORY_CHARS:,} characters). Remove a source first."
+            )
 
-        print(f"Added source to memory. Session: {session_id}, Total sources: {len(lecture_memory[session_id]['sources'])}")
+        logger.info("Added source to memory. Session: %s, Total sources: %s", session_id, source_count)
 
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "session_id": session_id,
-            "source_count": len(lecture_memory[session_id]["sources"]),
-            "combined_length": len(lecture_memory[session_id]["combined_text"]),
+            "source_count": source_count,
+            "combined_length": combined_length,
             "source_added": source_entry
         })
 
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Memory add error: {str(e)}")
+        logger.error("Memory add error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1237,17 +1866,16 @@ async def get_memory(session_id: Optional[str] = Cookie(default=None)):
     Returns all sources and combined text
     """
     try:
-        if not session_id or session_id not in lecture_memory:
-            return JSONResponse({
+        memory = await session_store.get(session_id) if session_id else None
+        if memory is None:
+            return ORJSONResponse({
                 "success": True,
                 "sources": [],
                 "combined_text": "",
                 "source_count": 0
             })
 
-        memory = lecture_memory[session_id]
-
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "sources": memory["sources"],
             "combined_text": memory["combined_text"],
@@ -1255,7 +1883,7 @@ async def get_memory(session_id: Optional[str] = Cookie(default=None)):
         })
 
     except Exception as e:
-        print(f"Memory get error: {str(e)}")
+        logger.error("Memory get error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1269,43 +1897,28 @@ async def remove_from_memory(
     Rebuilds combined text after removal
     """
     try:
-        if not session_id or session_id not in lecture_memory:
-            raise HTTPException(status_code=404, detail="No session found")
-
-        memory = lecture_memory[session_id]
-
-        if index < 0 or index >= len(memory["sources"]):
+        # Cut the source's block out in one store update; other blocks are unchanged
+        try:
+            removed = await session_store.remove_source(session_id, index) if session_id else None
+        except IndexError:
             raise HTTPException(status_code=400, detail="Invalid source index")
+        if removed is None:
+            raise HTTPException(status_code=404, detail="No session found")
+        removed_source, source_count, combined_length = removed
 
-        # Remove source
-        removed_source = memory["sources"].pop(index)
-
-        # Rebuild combined text
-        combined_parts = []
-        for idx, source in enumerate(memory["sources"], 1):
-            type_label = {
-                "text": "Text Input",
-                "pdf": "PDF Document",
-                "audio": "Audio Transcription"
-            }.get(source["type"], "Unknown Source")
-
-            combined_parts.append(f"=== Source {idx}: {type_label} - {source['filename']} ===\n\n{source['text']}\n\n")
-
-        memory["combined_text"] = "\n".join(combined_parts)
-
-        print(f"Removed source {index} from memory. Remaining sources: {len(memory['sources'])}")
+        logger.info("Removed source %s from memory. Remaining sources: %s", index, source_count)
 
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "removed": removed_source,
-            "source_count": len(memory["sources"]),
-            "combined_length": len(memory["combined_text"])
+            "source_count": source_count,
+            "combined_length": combined_length
         })
 
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"Memory remove error: {str(e)}")
+        logger.error("Memory remove error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1319,20 +1932,20 @@ async def clear_memory(
     Removes session from memory and clears cookie
     """
     try:
-        if session_id and session_id in lecture_memory:
-            del lecture_memory[session_id]
-            print(f"Cleared memory for session: {session_id}")
+        if session_id:
+            await session_store.delete(session_id)
+            logger.info("Cleared memory for session: %s", session_id)
 
         # Clear cookie
         response.delete_cookie(key="session_id")
 
-        return JSONResponse({
+        return ORJSONResponse({
             "success": True,
             "message": "Memory cleared successfully"
         })
 
     except Exception as e:
-        print(f"Memory clear error: {str(e)}")
+        logger.error("Memory clear error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1341,7 +1954,7 @@ async def get_config():
     """
     Return current configuration for frontend
     """
-    return JSONResponse({
+    return ORJSONResponse({
         "whisper_mode": config.WHISPER_MODE.value,
         "max_pdf_size_mb": config.MAX_PDF_SIZE / (1024 * 1024),
         "max_audio_size_mb": config.MAX_AUDIO_SIZE / (1024 * 1024),
@@ -1350,15 +1963,37 @@ async def get_config():
     })
 
 
+# Constant health payload, serialized once
+HEALTH_RESPONSE = Response(
+    content=orjson.dumps({"status": "healthy", "message": "Adaptive Lecture Summarizer is running"}),
+    media_type="application/json"
+)
+
+
 @app.get("/health")
 async def health_check():
     """
     Health check endpoint
     """
-    return {"status": "healthy", "message": "Adaptive Lecture Summarizer is running"}
+    return HEALTH_RESPONSE
 
 if __name__ == "__main__":
     import uvicorn
     print("Starting Adaptive Lecture Summarizer...")
     print("Open your browser to: http://localhost:8000")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    if config.WORKERS > 1 and not session_store.shared:
+        logger.warning(
+            "Running %s workers: session memory is per worker process, "
+            "so memory sources are only visible to the worker that stored them (set REDIS_URL to share them)",
+            config.WORKERS
+        )
+    # uvloop event loop and httptools parser. Workers need the app as an import
+    # string; a single process is handed this app so main.py is not imported twice
+    uvicorn.run(
+        app if config.WORKERS == 1 else "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=config.WORKERS
+    )
\ No newline at end of file
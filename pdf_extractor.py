@@ -2,28 +2,39 @@
 PDF Text Extraction Module
 ===========================
 
-Extracts text from PDF files using PyPDF2.
+Extracts text from PDF files using pypdfium2 (PDFium, native code).
 Supports text-based PDFs only (no OCR for scanned documents).
 
 Author: Hackathon Team
 Date: November 2025
 """
 
-import io
-from PyPDF2 import PdfReader
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional
+
+import pypdfium2 as pdfium
 from fastapi import HTTPException
 
+from document_extractor import extract_pdf_page, extract_pdf_pages
+
+logger = logging.getLogger(__name__)
+
+# PDFium is not thread-safe: streaming extraction runs all its calls on this one thread
+PDF_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdfium")
+
 
 class PDFExtractor:
     """Extract text content from PDF files"""
 
     @staticmethod
-    def extract_text(pdf_bytes: bytes) -> str:
+    def extract_text(pdf_source: BinaryIO | bytes) -> str:
         """
         Extract text from PDF file
 
         Args:
-            pdf_bytes: PDF file content as bytes
+            pdf_source: PDF content as bytes or a seekable binary file
 
         Returns:
             str: Extracted text content
@@ -31,86 +42,187 @@ class PDFExtractor:
         Raises:
             HTTPException: If PDF is empty, unreadable, or image-based
         """
+        return PDFExtractor._extract(pdf_source, with_info=False)[0]
+
+    @staticmethod
+    def extract_all(pdf_source: BinaryIO | bytes) -> tuple[str, dict]:
+        """
+        Extract text and metadata from PDF file, parsing it once
+
+        Args:
+            pdf_source: PDF content as bytes or a seekable binary file
+                        (a file is read page by page, not loaded whole)
+
+        Returns:
+            tuple: (extracted text, metadata as returned by get_pdf_info)
+
+        Raises:
+            HTTPException: If PDF is empty, unreadable, or image-based
+        """
+        return PDFExtractor._extract(pdf_source, with_info=True)
+
+    @staticmethod
+    def _extract(pdf_source: BinaryIO | bytes, with_info: bool) -> tuple[str, Optional[dict]]:
+        """Open the PDF once, extract its text and optionally its metadata"""
+        try:
+            pdf = pdfium.PdfDocument(pdf_source)
+            try:
+                # Check if PDF has pages
+                num_pages = len(pdf)
+                if num_pages == 0:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="PDF file is empty (no pages found)"
+                    )
+
+                info = PDFExtractor._read_info(pdf) if with_info else None
+
+                # Extract text from all pages (large PDFs across worker processes)
+                text_content = extract_pdf_pages(pdf, pdf_source)
+            finally:
+                pdf.close()
+
+            return PDFExtractor._join_pages(text_content, num_pages), info
+
+        except HTTPException:
+            # Re-raise HTTP exceptions as-is
+            raise
+
+        except Exception as e:
+            raise PDFExtractor._extraction_error(e)
+
+    @staticmethod
+    async def extract_text_streaming(pdf_source: BinaryIO | bytes):
+        """
+        Extract text page by page, yielding progress as each page is read
+        Generator function for streaming results
+
+        Pages are read in order on PDF_EXECUTOR (no process fan-out), so
+        progress can be reported as extraction goes.
+
+        Args:
+            pdf_source: PDF content as bytes or a seekable binary file
+
+        Yields:
+            {"type": "page", "page": n, "total_pages": total} after each page, then
+            {"type": "complete", "text": ...} or {"type": "error", "message": ...}
+        """
+        loop = asyncio.get_running_loop()
+        pdf = None
         try:
-            # Create PDF reader from bytes
-            pdf_file = io.BytesIO(pdf_bytes)
-            pdf_reader = PdfReader(pdf_file)
+            pdf, num_pages = await loop.run_in_executor(PDF_EXECUTOR, PDFExtractor._open, pdf_source)
 
             # Check if PDF has pages
-            num_pages = len(pdf_reader.pages)
             if num_pages == 0:
                 raise HTTPException(
                     status_code=400,
                     detail="PDF file is empty (no pages found)"
                 )
 
-            # Extract text from all pages
             text_content = []
-            for page_num, page in enumerate(pdf_reader.pages, start=1):
-                page_text = page.extract_text()
-                if page_text and page_text.strip():
-                    text_content.append(page_text)
+            for page_index in range(num_pages):
+                text = await loop.run_in_executor(PDF_EXECUTOR, extract_pdf_page, pdf, page_index)
+                if text:
+                    text_content.append(text)
+                yield {"type": "page", "page": page_index + 1, "total_pages": num_pages}
 
-            # Join all pages with double newlines
-            full_text = "\n\n".join(text_content).strip()
+            yield {"type": "complete", "text": PDFExtractor._join_pages(text_content, num_pages)}
 
-            # Validate extraction was successful
-            if not full_text or len(full_text) < 50:
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        "Could not extract sufficient text from PDF. "
-                        "The PDF may be scanned, image-based, or encrypted. "
-                        "Only text-based PDFs are supported. "
-                        f"(Extracted only {len(full_text)} characters from {num_pages} pages)"
-                    )
-                )
+        except HTTPException as e:
+            yield {"type": "error", "message": e.detail}
+        except Exception as e:
+            yield {"type": "error", "message": PDFExtractor._extraction_error(e).detail}
+        finally:
+            if pdf is not None:
+                # Queued behind any page still being read
+                await loop.run_in_executor(PDF_EXECUTOR, pdf.close)
 
-            print(f"Successfully extracted {len(full_text)} characters from {num_pages} pages")
-            return full_text
+    @staticmethod
+    def _open(pdf_source: BinaryIO | bytes) -> tuple[pdfium.PdfDocument, int]:
+        """Open a document and count its pages (one PDF_EXECUTOR call)"""
+        pdf = pdfium.PdfDocument(pdf_source)
+        return pdf, len(pdf)
 
-        except HTTPException:
-            # Re-raise HTTP exceptions as-is
-            raise
+    @staticmethod
+    def _join_pages(text_content: list[str], num_pages: int) -> str:
+        """
+        Join page texts with double newlines, rejecting too little text
 
-        except Exception as e:
-            # Catch all other errors (corrupted PDF, invalid format, etc.)
-            error_msg = str(e)
-            if "encrypted" in error_msg.lower():
-                detail = "PDF is encrypted or password-protected. Please provide an unencrypted PDF."
-            elif "invalid" in error_msg.lower() or "corrupt" in error_msg.lower():
-                detail = f"PDF file appears to be corrupted or invalid: {error_msg}"
-            else:
-                detail = f"PDF extraction failed: {error_msg}"
+        Raises:
+            HTTPException: 400 if under 50 characters were extracted
+        """
+        full_text = "\n\n".join(text_content).strip()
 
+        # Validate extraction was successful
+        if not full_text or len(full_text) < 50:
             raise HTTPException(
-                status_code=500,
-                detail=detail
+                status_code=400,
+                detail=(
+                    "Could not extract sufficient text from PDF. "
+                    "The PDF may be scanned, image-based, or encrypted. "
+                    "Only text-based PDFs are supported. "
+                    f"(Extracted only {len(full_text)} characters from {num_pages} pages)"
+                )
             )
 
+        logger.info("Successfully extracted %s characters from %s pages", len(full_text), num_pages)
+        return full_text
+
+    @staticmethod
+    def _extraction_error(e: Exception) -> HTTPException:
+        """
+        Classify a parsing failure (corrupted PDF, invalid format, etc.) as a 500 with a readable message
+        """
+        error_msg = str(e)
+        if "encrypted" in error_msg.lower() or "password" in error_msg.lower():
+            detail = "PDF is encrypted or password-protected. Please provide an unencrypted PDF."
+        elif "invalid" in error_msg.lower() or "corrupt" in error_msg.lower():
+            detail = f"PDF file appears to be corrupted or invalid: {error_msg}"
+        else:
+            detail = f"PDF extraction failed: {error_msg}"
+
+        return HTTPException(
+            status_code=500,
+            detail=detail
+        )
+
     @staticmethod
-    def get_pdf_info(pdf_bytes: bytes) -> dict:
+    def get_pdf_info(pdf_source: BinaryIO | bytes) -> dict:
         """
         Get PDF metadata information
 
         Args:
-            pdf_bytes: PDF file content as bytes
+            pdf_source: PDF content as bytes or a seekable binary file
 
         Returns:
             dict: PDF metadata (pages, title, author, etc.)
         """
         try:
-            pdf_file = io.BytesIO(pdf_bytes)
-            pdf_reader = PdfReader(pdf_file)
+            pdf = pdfium.PdfDocument(pdf_source)
+        except Exception as e:
+            # Return minimal info if the PDF cannot be opened
+            return {
+                "num_pages": 0,
+                "error": str(e)
+            }
 
-            metadata = pdf_reader.metadata or {}
+        try:
+            return PDFExtractor._read_info(pdf)
+        finally:
+            pdf.close()
 
+    @staticmethod
+    def _read_info(pdf: pdfium.PdfDocument) -> dict:
+        """Read metadata from an open PDF (minimal info if that fails)"""
+        try:
+            # PDFium reports missing fields as empty strings; skip them so defaults apply
+            metadata = pdf.get_metadata_dict(skip_empty=True)
             return {
-                "num_pages": len(pdf_reader.pages),
-                "title": metadata.get("/Title", "Unknown"),
-                "author": metadata.get("/Author", "Unknown"),
-                "creator": metadata.get("/Creator", "Unknown"),
-                "producer": metadata.get("/Producer", "Unknown"),
+                "num_pages": len(pdf),
+                "title": metadata.get("Title", "Unknown"),
+                "author": metadata.get("Author", "Unknown"),
+                "creator": metadata.get("Creator", "Unknown"),
+                "producer": metadata.get("Producer", "Unknown"),
             }
 
         except Exception as e:
@@ -0,0 +1,280 @@
+"""
+Semantic Response Cache
+=======================
+
+Caches Claude responses keyed by an embedding of the request text, so a
+re-submitted (identical or near-identical) transcript is answered from
+memory instead of another API round-trip.
+
+Exact repeats are answered from an LRU dict keyed on a BLAKE2 digest of
+the text before anything is embedded. Near-duplicates use
+sentence-transformers + FAISS when installed, and only for transcript-keyed
+kinds (SEMANTIC_KINDS); without them the cache is exact-match only.
+
+Author: Hackathon Team
+Date: November 2025
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Embedding model and its output dimension
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+EMBEDDING_DIM = 384
+
+# MiniLM truncates input at 256 word pieces; long transcripts are embedded
+# in chunks of roughly this many characters and mean-pooled
+EMBEDDING_CHUNK_CHARS = 1000
+
+# Nearest neighbours inspected per lookup (entries of other kinds/levels are skipped)
+SEARCH_K = 8
+
+# Exact-match entries kept (least recently used are evicted)
+EXACT_CACHE_SIZE = 512
+
+# Embedded entries kept; once over, the oldest are dropped down to 3/4 of this
+# and the index is rebuilt (amortized over the following inserts)
+SEMANTIC_CACHE_SIZE = 1024
+
+# Transcripts whose chunk embeddings are kept for excerpt retrieval
+CHUNK_CACHE_SIZE = 32
+
+# Kinds whose key text is a transcript, where a near-duplicate may share a
+# response. Every other kind (evaluations, answers: keyed by student input,
+# where one negation changes the right response) is exact-match only.
+SEMANTIC_KINDS = frozenset({"summaries", "summary_stream", "quiz"})
+
+
+def content_digest(text: str) -> str:
+    """Return a short BLAKE2 hex digest identifying a text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of LLM responses"""
+
+    def __init__(self, threshold: float, cache_dir: Optional[str] = None):
+        """
+        Initialize the cache, loading a persisted index if one exists
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            cache_dir: Directory for the persisted index, None = memory only
+        """
+        self.threshold = threshold
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._entries = []  # (kind, extra_key, payload, timestamp), parallel to the index
+        self._exact = OrderedDict()  # (digest, kind, extra_key) -> payload, LRU order
+        self._chunks = OrderedDict()  # digest -> (chunks, embeddings), LRU order
+
+        try:
+            import faiss
+            from sentence_transformers import SentenceTransformer
+            self._faiss = faiss
+            self.embedder = SentenceTransformer(EMBEDDING_MODEL)
+            self.index = faiss.IndexFlatIP(EMBEDDING_DIM)
+            logger.info("Semantic cache enabled (%s, threshold %s)", EMBEDDING_MODEL, threshold)
+        except ImportError:
+            self.embedder = None
+            self.index = None
+            logger.info("Semantic cache: faiss/sentence-transformers not installed, using exact-match cache")
+
+        self._load()
+
+    @staticmethod
+    def _split(text: str) -> list[str]:
+        return [
+            text[i:i + EMBEDDING_CHUNK_CHARS]
+            for i in range(0, len(text), EMBEDDING_CHUNK_CHARS)
+        ] or [""]
+
+    def _embed(self, text: str):
+        """Return an L2-normalized (1, EMBEDDING_DIM) float32 embedding"""
+        vectors = self.embedder.encode(self._split(text), convert_to_numpy=True, normalize_embeddings=True)
+        vector = vectors.mean(axis=0, keepdims=True).astype("float32")
+        self._faiss.normalize_L2(vector)
+        return vector
+
+    def lookup(self, key_text: str, kind: str, extra_key: Any = None) -> Optional[Any]:
+        """
+        Find a cached payload for the same text (or similar text, for SEMANTIC_KINDS)
+
+        Args:
+            key_text: Text the response was generated from (e.g. transcript)
+            kind: Response type ("summaries", "quiz", "evaluation", ...)
+            extra_key: Other request parameters that must match exactly
+
+        Returns:
+            Cached payload, or None on a miss
+        """
+        exact_key = (content_digest(key_text), kind, extra_key)
+        with self._lock:
+            if exact_key in self._exact:
+                self._exact.move_to_end(exact_key)
+                return self._exact[exact_key]
+            if kind not in SEMANTIC_KINDS or self.index is None or self.index.ntotal == 0:
+                return None
+
+        vector = self._embed(key_text)
+        with self._lock:
+            scores, ids = self.index.search(vector, min(SEARCH_K, self.index.ntotal))
+            for score, idx in zip(scores[0], ids[0]):
+                if idx < 0 or score < self.threshold:
+                    break
+                entry_kind, entry_extra, payload, _ = self._entries[idx]
+                if entry_kind == kind and entry_extra == extra_key:
+                    logger.info("Semantic cache hit (%s, similarity %.3f)", kind, score)
+                    return payload
+        return None
+
+    async def alookup(self, key_text: str, kind: str, extra_key: Any = None) -> Optional[Any]:
+        """lookup() from async code: embedding runs in a worker thread, off the event loop"""
+        return await asyncio.to_thread(self.lookup, key_text, kind, extra_key)
+
+    def relevant_excerpts(self, text: str, query: str, k: int = 3) -> Optional[str]:
+        """
+        Pick the k chunks of text most similar to query
+
+        Chunk embeddings are kept per text (LRU), so repeated queries against
+        the same transcript only embed the query.
+
+        Args:
+            text: Text to excerpt (e.g. transcript)
+            query: Text the excerpts should be relevant to (e.g. question and answer)
+            k: Number of chunks to keep
+
+        Returns:
+            The chosen chunks in document order, or None without an embedding model
+        """
+        if self.embedder is None:
+            return None
+
+        digest = content_digest(text)
+        with self._lock:
+            cached = self._chunks.get(digest)
+            if cached is not None:
+                self._chunks.move_to_end(digest)
+        if cached is None:
+            chunks = self._split(text)
+            cached = (chunks, self.embedder.encode(chunks, convert_to_numpy=True, normalize_embeddings=True))
+            with self._lock:
+                self._chunks[digest] = cached
+                while len(self._chunks) > CHUNK_CACHE_SIZE:
+                    self._chunks.popitem(last=False)
+
+        chunks, vectors = cached
+        if len(chunks) <= k:
+            return text
+        query_vector = self.embedder.encode([query], convert_to_numpy=True, normalize_embeddings=True)[0]
+        best = sorted((vectors @ query_vector).argsort()[-k:])
+        return "\n\n[...]\n\n".join(chunks[i] for i in best)
+
+    def store(self, key_text: str, kind: str, extra_key: Any, payload: Any):
+        """
+        Add a response to the cache
+
+        Args:
+            key_text: Text the response was generated from
+            kind: Response type
+            extra_key: Other request parameters that must match exactly
+            payload: Response to return on later hits
+        """
+        vector = self._embed(key_text) if self.index is not None and kind in SEMANTIC_KINDS else None
+        with self._lock:
+            self._remember(content_digest(key_text), kind, extra_key, payload)
+            if vector is not None:
+                self.index.add(vector)
+                self._entries.append((kind, extra_key, payload, time.time()))
+                if len(self._entries) > SEMANTIC_CACHE_SIZE:
+                    self._evict_oldest(len(self._entries) - SEMANTIC_CACHE_SIZE * 3 // 4)
+
+    async def astore(self, key_text: str, kind: str, extra_key: Any, payload: Any):
+        """store() from async code: embedding runs in a worker thread, off the event loop"""
+        await asyncio.to_thread(self.store, key_text, kind, extra_key, payload)
+
+    def _remember(self, digest: str, kind: str, extra_key: Any, payload: Any):
+        """Add an exact-match entry, evicting the least recently used (caller holds the lock)"""
+        self._exact[(digest, kind, extra_key)] = payload
+        self._exact.move_to_end((digest, kind, extra_key))
+        while len(self._exact) > EXACT_CACHE_SIZE:
+            self._exact.popitem(last=False)
+
+    def _evict_oldest(self, count: int):
+        """Drop the oldest count embedded entries and rebuild the index (caller holds the lock)"""
+        kept = self.index.reconstruct_n(count, self.index.ntotal - count)
+        index = self._faiss.IndexFlatIP(EMBEDDING_DIM)
+        index.add(kept)
+        self.index = index
+        del self._entries[:count]
+        logger.info("Semantic cache evicted %s oldest entries", count)
+
+    def _paths(self) -> tuple[str, str]:
+        return (
+            os.path.join(self.cache_dir, "semantic_cache.faiss"),
+            os.path.join(self.cache_dir, "semantic_cache.pkl"),
+        )
+
+    def _load(self):
+        """Load a previously saved cache from cache_dir"""
+        if not self.cache_dir:
+            return
+        index_path, entries_path = self._paths()
+        try:
+            with open(entries_path, "rb") as f:
+                entries, exact = pickle.load(f)
+            if self.index is not None and os.path.exists(index_path):
+                index = self._faiss.read_index(index_path)
+                if index.ntotal == len(entries):
+                    self.index = index
+                    self._entries = entries
+                    if len(entries) > SEMANTIC_CACHE_SIZE:
+                        self._evict_oldest(len(entries) - SEMANTIC_CACHE_SIZE)
+            for (digest, kind, extra_key), payload in exact.items():
+                self._remember(digest, kind, extra_key, payload)
+            logger.info("Semantic cache loaded: %s entries", len(self._exact))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning("Could not load semantic cache: %s", e)
+
+    def save(self):
+        """Persist the cache to cache_dir"""
+        if not self.cache_dir:
+            return
+        index_path, entries_path = self._paths()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with self._lock:
+                if self.index is not None:
+                    self._faiss.write_index(self.index, index_path)
+                with open(entries_path, "wb") as f:
+                    pickle.dump((self._entries, self._exact), f)
+            logger.info("Semantic cache saved: %s entries", len(self._exact))
+        except Exception as e:
+            logger.warning("Could not save semantic cache: %s", e)
+
+
+def create_response_cache() -> SemanticCache:
+    """
+    Build the app's response cache from config
+
+    Called from the app's startup hook rather than at import, so processes
+    that only import the app module (spawned PDF workers) never load the
+    embedding model.
+    """
+    return SemanticCache(
+        threshold=config.SEMANTIC_CACHE_THRESHOLD,
+        cache_dir=config.SEMANTIC_CACHE_DIR
+    )
@@ -0,0 +1,358 @@
+"""
+Session Memory Store
+====================
+
+Holds each session's lecture memory ({"sources": [...], "combined_text": str})
+with a TTL, so abandoned sessions expire instead of accumulating.
+
+Uses Redis when REDIS_URL is set and redis is installed, which also shares
+sessions between uvicorn workers (sources in a list, combined text in its
+own key, so adding a source appends instead of rewriting the session).
+Otherwise sessions live in this process, bounded by MAX_SESSIONS (least
+recently used are evicted).
+
+Both stores build the combined text themselves (one labelled block per
+source), so adding or removing a source is a single atomic update.
+
+Author: Hackathon Team
+Date: November 2025
+"""
+
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional
+
+import orjson
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Header labels for session memory sources, by source type
+SOURCE_TYPE_LABELS = {
+    "text": "Text Input",
+    "pdf": "PDF Document",
+    "audio": "Audio Transcription"
+}
+
+
+def format_source_block(source: dict) -> str:
+    """
+    Format one memory source as a labelled block of the combined text
+
+    Blocks are labelled by the source's stable id rather than its position,
+    so adding or removing a source never changes the other blocks.
+    """
+    type_label = SOURCE_TYPE_LABELS.get(source["type"], "Unknown Source")
+    return f"=== Source {source['id'][:8]}: {type_label} - {source['filename']} ===\n\n{source['text']}\n\n"
+
+
+def combine_sources(sources: list) -> str:
+    """
+    Build a session's combined text from all of its sources
+    """
+    for source in sources:
+        source.setdefault("id", str(uuid.uuid4()))  # Sources stored before ids were added
+    return "\n".join(format_source_block(source) for source in sources)
+
+
+def remove_source_block(combined_text: str, source: dict) -> Optional[str]:
+    """
+    Cut one source's block (and its separator) out of the combined text
+
+    Returns:
+        The remaining combined text, or None if the block was not found
+    """
+    if "id" not in source:
+        return None
+    block = format_source_block(source)
+    start = combined_text.find(block)
+    if start == -1:
+        return None
+    end = start + len(block)
+    if start > 0:
+        start -= 1  # Separator before the block
+    elif combined_text[end:end + 1] == "\n":
+        end += 1    # First block: separator after it
+    return combined_text[:start] + combined_text[end:]
+
+
+def without_source(sources: list, combined_text: str, index: int) -> tuple[dict, str]:
+    """
+    Drop the source at index from a session's combined text
+
+    Other blocks are unchanged; the text is only rebuilt from the remaining
+    sources when the block cannot be found.
+
+    Returns:
+        (removed source, remaining combined text)
+
+    Raises:
+        IndexError: If index is not a source position
+    """
+    if not 0 <= index < len(sources):
+        raise IndexError(f"Invalid source index: {index}")
+    removed_source = sources[index]
+    remaining_text = remove_source_block(combined_text, removed_source)
+    if remaining_text is None:
+        remaining_text = combine_sources(sources[:index] + sources[index + 1:])
+    return removed_source, remaining_text
+
+
+class MemoryFullError(Exception):
+    """Adding a source would take the combined text past the store's max_chars"""
+
+
+class MemorySessionStore:
+    """In-process session store with TTL and LRU eviction"""
+
+    shared = False  # Sessions are not visible to other workers
+
+    def __init__(self, ttl: int, max_sessions: int, max_chars: int):
+        """
+        Args:
+            ttl: Seconds a session lives after its last write
+            max_sessions: Sessions kept before the least recently used is evicted
+            max_chars: Longest combined text a session may hold
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_chars = max_chars
+        self._sessions = OrderedDict()  # session_id -> (expires_at, memory)
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        """Return the session's memory, or None if missing or expired"""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        expires_at, memory = entry
+        if expires_at < time.monotonic():
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return memory
+
+    async def get_combined_text(self, session_id: str) -> Optional[str]:
+        """Return only the session's combined text, or None if missing or expired"""
+        memory = await self.get(session_id)
+        return memory["combined_text"] if memory is not None else None
+
+    async def combined_length(self, session_id: str) -> int:
+        """Return the length of the session's combined text (0 if missing)"""
+        combined_text = await self.get_combined_text(session_id)
+        return len(combined_text) if combined_text is not None else 0
+
+    async def append_source(self, session_id: str, source: dict) -> tuple[int, int]:
+        """
+        Add a source and append its block to the combined text, creating the session if needed
+
+        Returns:
+            (source count, combined text length)
+
+        Raises:
+            MemoryFullError: If the block would overfill the session (nothing is changed)
+        """
+        memory = await self.get(session_id)
+        combined_text = memory["combined_text"] if memory is not None else ""
+        block = format_source_block(source)
+        if len(combined_text) + bool(combined_text) + len(block) > self.max_chars:
+            raise MemoryFullError(session_id)
+        if memory is None:
+            memory = {"sources": [], "combined_text": ""}
+            logger.info("Initialized new memory for session: %s", session_id)
+        memory["sources"].append(source)
+        memory["combined_text"] = f"{memory['combined_text']}\n{block}" if memory["combined_text"] else block
+        self._save(session_id, memory)
+        return len(memory["sources"]), len(memory["combined_text"])
+
+    async def remove_source(self, session_id: str, index: int) -> Optional[tuple[dict, int, int]]:
+        """
+        Remove the source at index and cut its block out of the combined text
+
+        Returns:
+            (removed source, remaining source count, combined text length),
+            or None if the session is missing or expired
+
+        Raises:
+            IndexError: If index is not a source position
+        """
+        memory = await self.get(session_id)
+        if memory is None:
+            return None
+        removed_source, memory["combined_text"] = without_source(
+            memory["sources"], memory["combined_text"], index
+        )
+        memory["sources"] = memory["sources"][:index] + memory["sources"][index + 1:]
+        self._save(session_id, memory)
+        return removed_source, len(memory["sources"]), len(memory["combined_text"])
+
+    def _save(self, session_id: str, memory: dict):
+        """Store the session's memory and restart its TTL"""
+        self._sessions[session_id] = (time.monotonic() + self.ttl, memory)
+        self._sessions.move_to_end(session_id)
+        while len(self._sessions) > self.max_sessions:
+            evicted, _ = self._sessions.popitem(last=False)
+            logger.info("Evicted session memory: %s", evicted)
+
+    async def delete(self, session_id: str):
+        """Remove the session's memory if present"""
+        self._sessions.pop(session_id, None)
+
+    async def close(self):
+        pass
+
+
+class RedisSessionStore:
+    """
+    Redis-backed session store, expiring after ttl
+
+    Each session is three keys: a list of orjson-encoded sources
+    (session:{id}:sources), the combined text (session:{id}:combined) and
+    its length in characters (session:{id}:chars; STRLEN counts bytes).
+    Adding or removing a source is one WATCH/MULTI transaction over all
+    three, retried if another request changed the session in between, and
+    transcript lookups read only the combined text, so no request
+    re-serializes the whole session.
+    """
+
+    shared = True
+
+    # Placeholder written over a source with LSET so LREM can drop it by value
+    REMOVED = "__removed__"
+
+    def __init__(self, url: str, ttl: int, max_chars: int):
+        """
+        Args:
+            url: Redis connection URL
+            ttl: Seconds a session lives after its last write
+            max_chars: Longest combined text a session may hold
+        """
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self.max_chars = max_chars
+        self.client = redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _keys(session_id: str) -> tuple[str, str, str]:
+        return f"session:{session_id}:sources", f"session:{session_id}:combined", f"session:{session_id}:chars"
+
+    @staticmethod
+    async def _length(conn, combined_key: str, chars_key: str) -> int:
+        """Read the combined text length in characters (0 if missing)"""
+        chars = await conn.get(chars_key)
+        if chars is None:
+            # Session written before its character count was kept
+            combined_text = await conn.get(combined_key)
+            return len(combined_text) if combined_text is not None else 0
+        return int(chars)
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        """Return the session's memory, or None if missing or expired"""
+        sources_key, combined_key, _ = self._keys(session_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            sources, combined_text = await pipe.lrange(sources_key, 0, -1).get(combined_key).execute()
+        if combined_text is None:
+            return None
+        return {"sources": [orjson.loads(source) for source in sources], "combined_text": combined_text}
+
+    async def get_combined_text(self, session_id: str) -> Optional[str]:
+        """Return only the session's combined text, or None if missing or expired"""
+        return await self.client.get(self._keys(session_id)[1])
+
+    async def combined_length(self, session_id: str) -> int:
+        """Return the length of the session's combined text (0 if missing)"""
+        _, combined_key, chars_key = self._keys(session_id)
+        return await self._length(self.client, combined_key, chars_key)
+
+    async def append_source(self, session_id: str, source: dict) -> tuple[int, int]:
+        """
+        Add a source and append its block to the combined text, creating the session if needed
+
+        Returns:
+            (source count, combined text length)
+
+        Raises:
+            MemoryFullError: If the block would overfill the session (nothing is changed)
+        """
+        keys = self._keys(session_id)
+        sources_key, combined_key, chars_key = keys
+        block = format_source_block(source)
+
+        async def append(pipe):
+            source_count = await pipe.llen(sources_key)
+            combined_length = await self._length(pipe, combined_key, chars_key)
+            # Checked against the watched length, so concurrent adds cannot both pass
+            if combined_length + bool(source_count) + len(block) > self.max_chars:
+                raise MemoryFullError(session_id)
+            pipe.multi()
+            pipe.rpush(sources_key, orjson.dumps(source))
+            if source_count == 0:
+                pipe.set(combined_key, block)
+                combined_length = len(block)
+            else:
+                pipe.append(combined_key, f"\n{block}")
+                combined_length += len(block) + 1
+            pipe.set(chars_key, combined_length)
+            for key in keys:
+                pipe.expire(key, self.ttl)
+            return source_count + 1, combined_length
+
+        source_count, combined_length = await self.client.transaction(append, *keys, value_from_callable=True)
+        if source_count == 1:
+            logger.info("Initialized new memory for session: %s", session_id)
+        return source_count, combined_length
+
+    async def remove_source(self, session_id: str, index: int) -> Optional[tuple[dict, int, int]]:
+        """
+        Remove the source at index and cut its block out of the combined text
+
+        Returns:
+            (removed source, remaining source count, combined text length),
+            or None if the session is missing or expired
+
+        Raises:
+            IndexError: If index is not a source position
+        """
+        keys = self._keys(session_id)
+        sources_key, combined_key, chars_key = keys
+
+        async def remove(pipe):
+            sources = await pipe.lrange(sources_key, 0, -1)
+            combined_text = await pipe.get(combined_key)
+            if combined_text is None:
+                return None
+            sources = [orjson.loads(source) for source in sources]
+            removed_source, remaining_text = without_source(sources, combined_text, index)
+            pipe.multi()
+            pipe.lset(sources_key, index, self.REMOVED).lrem(sources_key, 1, self.REMOVED)
+            pipe.set(combined_key, remaining_text, ex=self.ttl).set(chars_key, len(remaining_text), ex=self.ttl)
+            pipe.expire(sources_key, self.ttl)
+            return removed_source, len(sources) - 1, len(remaining_text)
+
+        return await self.client.transaction(remove, *keys, value_from_callable=True)
+
+    async def delete(self, session_id: str):
+        """Remove the session's memory if present"""
+        await self.client.delete(*self._keys(session_id))
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_session_store():
+    """Pick Redis when configured and available, else the in-process store"""
+    if config.REDIS_URL:
+        try:
+            store = RedisSessionStore(config.REDIS_URL, config.SESSION_TTL, config.MAX_MEMORY_CHARS)
+            logger.info("Session memory stored in Redis")
+            return store
+        except ImportError:
+            logger.warning("REDIS_URL is set but redis is not installed, keeping session memory in process")
+    return MemorySessionStore(config.SESSION_TTL, config.MAX_SESSIONS, config.MAX_MEMORY_CHARS)
+
+
+# Singleton store instance
+session_store = create_session_store()